@@ -3,6 +3,7 @@
 
 import os
 import logging
+import sqlite3
 import warnings
 from logging.handlers import RotatingFileHandler
 from flask import Flask
@@ -10,6 +11,8 @@ from flask import Flask
 # Suppress numba warning about nopython parameter
 warnings.filterwarnings('ignore', message='nopython is set for njit and is ignored', category=RuntimeWarning)
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 from flask_login import LoginManager
 from flask_migrate import Migrate
 from flask_wtf.csrf import CSRFProtect, CSRFError
@@ -26,6 +29,22 @@ csrf = CSRFProtect()
 sess = Session()
 limiter = None
 
+
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    """Use WAL on SQLite so readers don't block the exit-claim writes (and vice versa)"""
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    # No busy_timeout PRAGMA here: the driver's connect timeout (SQLALCHEMY_ENGINE_OPTIONS,
+    # 30s) already installs the busy handler, and a PRAGMA would override it.
+    # wal_autocheckpoint is left at SQLite's default of 1000 pages.
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")  # Safe with WAL, fsyncs only at checkpoints
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    cursor.close()
+
 def setup_logging(app):
     """Set up centralized logging with JSON format"""
 
@@ -294,16 +313,9 @@ def create_app(config_name=None):
                         app.logger.debug(f"Authentication successful, starting essential services in background")
                         # Start position monitor and risk manager (NOT option chains)
                         # Option chains load on-demand only when user visits the page
-                        import threading
-                        def delayed_start(flask_app, primary_acct):
-                            import time
-                            time.sleep(2)  # Wait for app to fully initialize
-                            try:
-                                with flask_app.app_context():
-                                    option_chain_service.on_primary_account_connected(primary_acct)
-                            except Exception as e:
-                                flask_app.logger.error(f"Error starting services: {e}")
-                        threading.Thread(target=delayed_start, args=(app, primary), daemon=True).start()
+                        # The app is fully configured at this point and the services start on
+                        # their own background task, so no warm-up delay is needed
+                        option_chain_service.on_primary_account_connected(primary)
                     else:
                         # Authentication failed - update connection status
                         app.logger.warning(f"Primary account {primary.account_name} authentication failed: {ping_response.get('message', 'Unknown error')}")
@@ -1,5 +1,10 @@
 from datetime import datetime
+import threading
+from cachetools import TTLCache
 from flask_login import UserMixin
+from sqlalchemy import case, select, insert as sa_insert, update as sa_update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from werkzeug.security import generate_password_hash, check_password_hash
 from cryptography.fernet import Fernet
 import os
@@ -14,6 +19,15 @@ def get_ist_now():
     """Get current time in IST (naive datetime for DB storage)"""
     return datetime.now(IST).replace(tzinfo=None)
 
+# Supertrend timeframe -> candle length in minutes (unknown timeframes use 5m)
+SUPERTREND_TIMEFRAME_MINUTES = {
+    '3m': 3,
+    '5m': 5,
+    '10m': 10,
+    '15m': 15
+}
+DEFAULT_SUPERTREND_TIMEFRAME_MINUTES = 5
+
 # Load environment variables first
 load_dotenv()
 
@@ -31,6 +45,23 @@ else:
 cipher_suite = Fernet(ENCRYPTION_KEY)
 
 
+# Decrypted API keys by ciphertext. Short-lived so plaintext keys don't stay in memory
+# for the life of the process; set_api_key evicts the replaced key straight away
+_api_key_cache = TTLCache(maxsize=128, ttl=300)
+_api_key_cache_lock = threading.Lock()
+
+
+def _decrypt_api_key(api_key_encrypted):
+    """Decrypt an API key, reusing the result for repeated calls within the cache TTL"""
+    with _api_key_cache_lock:
+        api_key = _api_key_cache.get(api_key_encrypted)
+    if api_key is None:
+        api_key = cipher_suite.decrypt(api_key_encrypted.encode()).decode()
+        with _api_key_cache_lock:
+            _api_key_cache[api_key_encrypted] = api_key
+    return api_key
+
+
 class User(UserMixin, db.Model):
     __tablename__ = 'users'
     
@@ -99,14 +130,16 @@ class TradingAccount(db.Model):
     
     def set_api_key(self, api_key):
         """Encrypt and store API key"""
+        if self.api_key_encrypted:
+            with _api_key_cache_lock:
+                _api_key_cache.pop(self.api_key_encrypted, None)
         encrypted = cipher_suite.encrypt(api_key.encode())
         self.api_key_encrypted = encrypted.decode()
     
     def get_api_key(self):
         """Decrypt and return API key"""
         if self.api_key_encrypted:
-            decrypted = cipher_suite.decrypt(self.api_key_encrypted.encode())
-            return decrypted.decode()
+            return _decrypt_api_key(self.api_key_encrypted)
         return None
     
     def __repr__(self):
@@ -327,6 +360,18 @@ class Strategy(db.Model):
     legs = db.relationship('StrategyLeg', backref='strategy', lazy='dynamic', cascade='all, delete-orphan')
     executions = db.relationship('StrategyExecution', backref='strategy', lazy='dynamic', cascade='all, delete-orphan')
 
+    # Supertrend monitor lookup (see migrate/upgrade/015_add_supertrend_strategy_index.py)
+    __table_args__ = (
+        db.Index('ix_strategy_supertrend_active', 'is_active', 'supertrend_exit_triggered',
+                 sqlite_where=db.text("supertrend_exit_enabled = 1"),
+                 postgresql_where=db.text("supertrend_exit_enabled = true")),
+    )
+
+    @property
+    def supertrend_timeframe_minutes(self):
+        """Candle length in minutes for supertrend_timeframe"""
+        return SUPERTREND_TIMEFRAME_MINUTES.get(self.supertrend_timeframe, DEFAULT_SUPERTREND_TIMEFRAME_MINUTES)
+
     @property
     def total_pnl(self):
         """
@@ -517,6 +562,21 @@ class StrategyExecution(db.Model):
     account = db.relationship('TradingAccount')
     leg = db.relationship('StrategyLeg')
 
+    # Partial indexes for the exit hot paths (see migrate/upgrade/013_add_exit_partial_indexes.py)
+    __table_args__ = (
+        # get_pending_exit_retries / atomic_claim_exit_retry
+        db.Index('ix_exec_pending_retry', 'strategy_id', 'exit_retry_after',
+                 sqlite_where=db.text("status = 'exit_pending' AND exit_order_id IS NULL"),
+                 postgresql_where=db.text("status = 'exit_pending' AND exit_order_id IS NULL")),
+        # atomic_claim_exit / open-position lookups
+        db.Index('ix_exec_entered', 'strategy_id',
+                 sqlite_where=db.text("status = 'entered'"),
+                 postgresql_where=db.text("status = 'entered'")),
+        # trigger_sequential_exit open-execution queries; also serves plain (strategy_id, status)
+        # lookups (see migrate/upgrade/016_add_execution_status_index.py)
+        db.Index('ix_exec_strategy_status_exit', 'strategy_id', 'status', 'exit_order_id'),
+    )
+
     def __repr__(self):
         return f'<StrategyExecution {self.symbol} {self.status}>'
 
@@ -560,6 +620,17 @@ class SpecialTradingSession(db.Model):
 class TradingSettings(db.Model):
     __tablename__ = 'trading_settings'
 
+    # Default settings per symbol (used when creating and resetting settings)
+    # Lot sizes: current month and next month (Jan 2025 onwards for NSE)
+    # BSE (SENSEX) has no lot size change
+    # Freeze quantities are based on exchange rules
+    # Updated freeze quantities as per NSE circular effective Dec 1, 2025
+    DEFAULT_SETTINGS = (
+        {'symbol': 'NIFTY', 'lot_size': 65, 'next_month_lot_size': 65, 'freeze_quantity': 1755, 'max_lots_per_order': 27},
+        {'symbol': 'BANKNIFTY', 'lot_size': 30, 'next_month_lot_size': 30, 'freeze_quantity': 600, 'max_lots_per_order': 20},
+        {'symbol': 'SENSEX', 'lot_size': 20, 'next_month_lot_size': 20, 'freeze_quantity': 1000, 'max_lots_per_order': 50},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)  # Fixed table name
     symbol = db.Column(db.String(50), nullable=False)  # 'NIFTY', 'BANKNIFTY', 'SENSEX'
@@ -585,35 +656,57 @@ class TradingSettings(db.Model):
     @staticmethod
     def get_or_create_defaults(user_id):
         """Create default settings for NIFTY, BANKNIFTY, and SENSEX if they don't exist"""
-        # Lot sizes: current month and next month (Jan 2025 onwards for NSE)
-        # BSE (SENSEX) has no lot size change
-        # Freeze quantities are based on exchange rules
-        # Updated freeze quantities as per NSE circular effective Dec 1, 2025
-        defaults = [
-            {'symbol': 'NIFTY', 'lot_size': 65, 'next_month_lot_size': 65, 'freeze_quantity': 1755, 'max_lots_per_order': 27},
-            {'symbol': 'BANKNIFTY', 'lot_size': 30, 'next_month_lot_size': 30, 'freeze_quantity': 600, 'max_lots_per_order': 20},
-            {'symbol': 'SENSEX', 'lot_size': 20, 'next_month_lot_size': 20, 'freeze_quantity': 1000, 'max_lots_per_order': 50},
+        existing = set(db.session.execute(
+            select(TradingSettings.symbol).where(TradingSettings.user_id == user_id)
+        ).scalars())
+        missing = [
+            dict(default, user_id=user_id)
+            for default in TradingSettings.DEFAULT_SETTINGS
+            if default['symbol'] not in existing
         ]
 
-        for default in defaults:
-            setting = TradingSettings.query.filter_by(
-                user_id=user_id,
-                symbol=default['symbol']
-            ).first()
-
-            if not setting:
-                setting = TradingSettings(
-                    user_id=user_id,
-                    symbol=default['symbol'],
-                    lot_size=default['lot_size'],
-                    next_month_lot_size=default.get('next_month_lot_size'),
-                    freeze_quantity=default['freeze_quantity'],
-                    max_lots_per_order=default['max_lots_per_order']
-                )
-                db.session.add(setting)
+        if missing:
+            # One multi-row INSERT; ON CONFLICT DO NOTHING covers a concurrent request creating the same rows
+            dialect = db.session.get_bind().dialect.name
+            if dialect == 'sqlite':
+                stmt = sqlite_insert(TradingSettings).on_conflict_do_nothing()
+            elif dialect == 'postgresql':
+                stmt = pg_insert(TradingSettings).on_conflict_do_nothing()
+            else:
+                stmt = sa_insert(TradingSettings)
+            db.session.execute(stmt.values(missing))
 
         db.session.commit()
 
+    @staticmethod
+    def reset_to_defaults(user_id):
+        """Reset a user's settings to defaults in a single UPDATE, creating any missing rows"""
+        defaults = {d['symbol']: d for d in TradingSettings.DEFAULT_SETTINGS}
+
+        def default_for(field):
+            return case({symbol: d[field] for symbol, d in defaults.items()},
+                        value=TradingSettings.symbol)
+
+        result = db.session.execute(
+            sa_update(TradingSettings)
+            .where(TradingSettings.user_id == user_id)
+            .where(TradingSettings.symbol.in_(defaults))
+            .values(
+                lot_size=default_for('lot_size'),
+                next_month_lot_size=default_for('next_month_lot_size'),
+                freeze_quantity=default_for('freeze_quantity'),
+                max_lots_per_order=default_for('max_lots_per_order'),
+                is_active=True
+            )
+            .execution_options(synchronize_session=False)
+        )
+
+        if result.rowcount < len(defaults):
+            # Some symbols have no row yet - create them (commits)
+            TradingSettings.get_or_create_defaults(user_id)
+        else:
+            db.session.commit()
+
 class MarginRequirement(db.Model):
     __tablename__ = 'margin_requirements'
 
@@ -482,42 +482,28 @@ def option_chain_stream(underlying):
 
     # Log outside the generator where we have app context
     current_app.logger.debug(f"[SSE] Starting stream for {underlying} with expiry {expiry}")
-    current_app.logger.debug(f"[SSE] Active managers: {list(option_chain_service.active_managers.keys())}")
+    current_app.logger.debug(f"[SSE] Active managers: {option_chain_service.get_active_chain_keys()}")
     
     def generate():
-        # Determine the manager key to use
-        manager_key = f"{underlying}_{expiry}" if expiry else None
-        
         while True:
             try:
                 # Try to find the appropriate manager
-                manager = None
+                managers = option_chain_service.active_managers.get(underlying, {})
                 
-                if manager_key and manager_key in option_chain_service.active_managers:
+                if expiry:
                     # Exact match with expiry
-                    manager = option_chain_service.active_managers[manager_key]
+                    manager = managers.get(expiry)
                 else:
-                    # Find any manager for this underlying
-                    for key in option_chain_service.active_managers.keys():
-                        if key.startswith(f"{underlying}_"):
-                            # If no expiry specified, use the first available
-                            if not expiry:
-                                manager = option_chain_service.active_managers[key]
-                                # print(f"[SSE] Using manager {key} for {underlying}")
-                                break
-                            # If expiry specified but not found, try to start it
-                            elif key.endswith(f"_{expiry}"):
-                                manager = option_chain_service.active_managers[key]
-                                break
+                    # If no expiry specified, use the first available
+                    manager = next(iter(managers.values()), None)
                 
                 # If no manager found, try to start one
                 if not manager and expiry:
                     # print(f"[SSE] No manager found for {underlying}_{expiry}, attempting to start")
                     # Try to start option chain (will handle failover internally)
                     if option_chain_service.start_option_chain(underlying, expiry):
-                        manager_key = f"{underlying}_{expiry}"
-                        manager = option_chain_service.active_managers.get(manager_key)
-                        # print(f"[SSE] Started new manager for {manager_key}")
+                        manager = option_chain_service.active_managers.get(underlying, {}).get(expiry)
+                        # print(f"[SSE] Started new manager for {underlying}_{expiry}")
                     else:
                         # print(f"[SSE] Failed to start option chain for {underlying}_{expiry} - checking for backup accounts")
                         # If primary fails and we have backup accounts, trigger failover
@@ -526,9 +512,8 @@ def option_chain_stream(underlying):
                             option_chain_service.on_account_disconnected(option_chain_service.primary_account)
                             # Try again after failover
                             if option_chain_service.start_option_chain(underlying, expiry):
-                                manager_key = f"{underlying}_{expiry}"
-                                manager = option_chain_service.active_managers.get(manager_key)
-                                # print(f"[SSE] Started manager after failover for {manager_key}")
+                                manager = option_chain_service.active_managers.get(underlying, {}).get(expiry)
+                                # print(f"[SSE] Started manager after failover for {underlying}_{expiry}")
                 
                 if manager:
                     chain_data = manager.get_option_chain()
@@ -613,8 +598,8 @@ def option_chain_status():
     from app.utils.background_service import option_chain_service
 
     try:
-        nifty_manager = option_chain_service.active_managers.get('NIFTY')
-        banknifty_manager = option_chain_service.active_managers.get('BANKNIFTY')
+        nifty_manager = next(iter(option_chain_service.active_managers.get('NIFTY', {}).values()), None)
+        banknifty_manager = next(iter(option_chain_service.active_managers.get('BANKNIFTY', {}).values()), None)
 
         status = {
             'service_running': option_chain_service.is_running,
@@ -666,7 +651,7 @@ def start_option_chains():
             'status': 'success',
             'message': 'Option chains started',
             'primary_account': primary_account.account_name,
-            'active_chains': list(option_chain_service.active_managers.keys())
+            'active_chains': option_chain_service.get_active_chain_keys()
         })
         
     except Exception as e:
@@ -1261,26 +1246,23 @@ def get_risk_status():
             option_type = match.group(4)
             current_app.logger.debug(f"[RiskMonitor] Parsed: underlying={underlying}, strike={strike}, type={option_type}")
 
-            active_keys = list(option_chain_service.active_managers.keys())
-            current_app.logger.debug(f"[RiskMonitor] Active managers: {active_keys}")
+            current_app.logger.debug(f"[RiskMonitor] Active managers: {option_chain_service.get_active_chain_keys()}")
 
-            for key in active_keys:
-                if key.startswith(f"{underlying}_"):
-                    manager = option_chain_service.active_managers[key]
-                    chain_data = manager.get_option_chain()
+            for manager in list(option_chain_service.active_managers.get(underlying, {}).values()):
+                chain_data = manager.get_option_chain()
 
-                    if chain_data and chain_data.get('status') == 'success':
-                        strikes = chain_data.get('strikes', [])
-                        current_app.logger.debug(f"[RiskMonitor] Found {len(strikes)} strikes in chain")
-                        for strike_data in strikes:
-                            if strike_data.get('strike') == strike:
-                                ltp = strike_data.get('ce_ltp', 0) if option_type == 'CE' else strike_data.get('pe_ltp', 0)
-                                current_app.logger.debug(f"[RiskMonitor] Found LTP for {symbol}: {ltp}")
-                                return ltp
-                        current_app.logger.warning(f"[RiskMonitor] Strike {strike} not found in chain. Available: {[s.get('strike') for s in strikes[:5]]}...")
-                    else:
-                        current_app.logger.warning(f"[RiskMonitor] Chain data not available for {key}")
-                    break
+                if chain_data and chain_data.get('status') == 'success':
+                    strikes = chain_data.get('strikes', [])
+                    current_app.logger.debug(f"[RiskMonitor] Found {len(strikes)} strikes in chain")
+                    for strike_data in strikes:
+                        if strike_data.get('strike') == strike:
+                            ltp = strike_data.get('ce_ltp', 0) if option_type == 'CE' else strike_data.get('pe_ltp', 0)
+                            current_app.logger.debug(f"[RiskMonitor] Found LTP for {symbol}: {ltp}")
+                            return ltp
+                    current_app.logger.warning(f"[RiskMonitor] Strike {strike} not found in chain. Available: {[s.get('strike') for s in strikes[:5]]}...")
+                else:
+                    current_app.logger.warning(f"[RiskMonitor] Chain data not available for {underlying}")
+                break
             else:
                 current_app.logger.warning(f"[RiskMonitor] No active manager found for {underlying}")
 
@@ -1922,20 +1904,18 @@ def risk_status_stream():
             option_type = match.group(4)
 
             # Find the option chain manager for this underlying
-            for key in option_chain_service.active_managers.keys():
-                if key.startswith(f"{underlying}_"):
-                    manager = option_chain_service.active_managers[key]
-                    chain_data = manager.get_option_chain()
-
-                    if chain_data and chain_data.get('status') == 'success':
-                        strikes = chain_data.get('strikes', [])
-                        for strike_data in strikes:
-                            if strike_data.get('strike') == strike:
-                                if option_type == 'CE':
-                                    return strike_data.get('ce_ltp', 0)
-                                else:
-                                    return strike_data.get('pe_ltp', 0)
-                    break
+            for manager in list(option_chain_service.active_managers.get(underlying, {}).values()):
+                chain_data = manager.get_option_chain()
+
+                if chain_data and chain_data.get('status') == 'success':
+                    strikes = chain_data.get('strikes', [])
+                    for strike_data in strikes:
+                        if strike_data.get('strike') == strike:
+                            if option_type == 'CE':
+                                return strike_data.get('ce_ltp', 0)
+                            else:
+                                return strike_data.get('pe_ltp', 0)
+                break
 
             return None
         except Exception as e:
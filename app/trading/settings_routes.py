@@ -1,39 +1,77 @@
-from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for
+from flask import Blueprint, render_template, request, jsonify, flash, redirect, url_for, g
 from flask_login import login_required, current_user
+from sqlalchemy import select
 from app import db
 from app.models import TradingSettings
 from app.utils.rate_limiter import auth_rate_limit
+import hashlib
+import time
 
 settings_bp = Blueprint('settings', __name__, url_prefix='/trading/settings')
 
+# Symbols that have configurable trading settings
+ALLOWED_SYMBOLS = frozenset({'NIFTY', 'BANKNIFTY', 'SENSEX'})
+
+# Process-local cache of settings snapshots: user_id -> (expires_at, {symbol: values})
+# Settings change rarely, so repeat page loads and API reads skip the DB entirely.
+# Invalidated by update() and reset().
+SETTINGS_CACHE_TTL = 300  # seconds
+_settings_cache = {}
+
+def _load_settings(user_id):
+    """Load all of a user's settings once per request, keyed by symbol"""
+    cached = g.get('_trading_settings')
+    if cached is not None:
+        return cached
+
+    rows = db.session.execute(
+        select(TradingSettings).where(
+            TradingSettings.user_id == user_id,
+            TradingSettings.symbol.in_(ALLOWED_SYMBOLS)
+        )
+    ).scalars().all()
+    g._trading_settings = {row.symbol: row for row in rows}
+    return g._trading_settings
+
+def _cached_settings(user_id):
+    """Return the cached settings snapshot for a user, or None if missing/expired"""
+    entry = _settings_cache.get(user_id)
+    if entry and entry[0] > time.monotonic():
+        return entry[1]
+    return None
+
+def _cache_settings(user_id):
+    """Load settings from the DB and store a plain-dict snapshot in the cache"""
+    snapshot = {
+        symbol: {
+            'symbol': row.symbol,
+            'lot_size': row.lot_size,
+            'next_month_lot_size': row.next_month_lot_size,
+            'freeze_quantity': row.freeze_quantity,
+            'max_lots_per_order': row.max_lots_per_order
+        }
+        for symbol, row in _load_settings(user_id).items()
+    }
+    _settings_cache[user_id] = (time.monotonic() + SETTINGS_CACHE_TTL, snapshot)
+    return snapshot
+
 @settings_bp.route('/')
 @login_required
 @auth_rate_limit()
 def index():
     """Display trading settings page"""
-    # Get or create default settings for the user
-    TradingSettings.get_or_create_defaults(current_user.id)
-    
-    # Fetch user's settings
-    nifty_settings = TradingSettings.query.filter_by(
-        user_id=current_user.id,
-        symbol='NIFTY'
-    ).first()
-    
-    banknifty_settings = TradingSettings.query.filter_by(
-        user_id=current_user.id,
-        symbol='BANKNIFTY'
-    ).first()
-    
-    sensex_settings = TradingSettings.query.filter_by(
-        user_id=current_user.id,
-        symbol='SENSEX'
-    ).first()
+    by_sym = _cached_settings(current_user.id)
+    if by_sym is None:
+        # Get or create default settings for the user
+        TradingSettings.get_or_create_defaults(current_user.id)
+        
+        # Fetch all of the user's settings in a single query
+        by_sym = _cache_settings(current_user.id)
     
     return render_template('trading/settings.html',
-                         nifty_settings=nifty_settings,
-                         banknifty_settings=banknifty_settings,
-                         sensex_settings=sensex_settings)
+                         nifty_settings=by_sym.get('NIFTY'),
+                         banknifty_settings=by_sym.get('BANKNIFTY'),
+                         sensex_settings=by_sym.get('SENSEX'))
 
 @settings_bp.route('/update', methods=['POST'])
 @login_required
@@ -47,7 +85,7 @@ def update():
             return jsonify({'success': False, 'message': 'No data provided'}), 400
         
         symbol = data.get('symbol')
-        if symbol not in ['NIFTY', 'BANKNIFTY', 'SENSEX']:
+        if symbol not in ALLOWED_SYMBOLS:
             return jsonify({'success': False, 'message': 'Invalid symbol'}), 400
         
         # Validate inputs
@@ -85,29 +123,39 @@ def update():
             max_lots = 1
         
         # Get or create setting
-        setting = TradingSettings.query.filter_by(
-            user_id=current_user.id,
-            symbol=symbol
-        ).first()
-        
-        if not setting:
-            setting = TradingSettings(
-                user_id=current_user.id,
-                symbol=symbol
-            )
-            db.session.add(setting)
-        
-        # Update values
-        setting.lot_size = lot_size
-        setting.next_month_lot_size = next_month_lot_size
-        setting.freeze_quantity = freeze_quantity
-        setting.max_lots_per_order = max_lots
+        settings = _load_settings(current_user.id)
+        setting = settings.get(symbol)
+
+        # Resubmitting the stored values is a no-op - skip the write and commit
+        unchanged = (
+            setting is not None
+            and setting.lot_size == lot_size
+            and setting.next_month_lot_size == next_month_lot_size
+            and setting.freeze_quantity == freeze_quantity
+            and setting.max_lots_per_order == max_lots
+        )
 
-        db.session.commit()
+        if not unchanged:
+            if not setting:
+                setting = TradingSettings(
+                    user_id=current_user.id,
+                    symbol=symbol
+                )
+                db.session.add(setting)
+                settings[symbol] = setting
+
+            # Update values
+            setting.lot_size = lot_size
+            setting.next_month_lot_size = next_month_lot_size
+            setting.freeze_quantity = freeze_quantity
+            setting.max_lots_per_order = max_lots
+
+            db.session.commit()
+            _settings_cache.pop(current_user.id, None)
 
         return jsonify({
             'success': True,
-            'message': f'{symbol} settings updated successfully',
+            'message': f'{symbol} settings {"unchanged" if unchanged else "updated successfully"}',
             'data': {
                 'symbol': symbol,
                 'lot_size': lot_size,
@@ -126,32 +174,36 @@ def update():
 @auth_rate_limit()
 def get_setting(symbol):
     """Get trading settings for a specific symbol"""
-    if symbol not in ['NIFTY', 'BANKNIFTY', 'SENSEX']:
+    if symbol not in ALLOWED_SYMBOLS:
         return jsonify({'success': False, 'message': 'Invalid symbol'}), 400
     
-    setting = TradingSettings.query.filter_by(
-        user_id=current_user.id,
-        symbol=symbol
-    ).first()
+    settings = _cached_settings(current_user.id)
     
-    if not setting:
-        # Create default if doesn't exist
-        TradingSettings.get_or_create_defaults(current_user.id)
-        setting = TradingSettings.query.filter_by(
-            user_id=current_user.id,
-            symbol=symbol
-        ).first()
+    if settings is None or symbol not in settings:
+        if symbol not in _load_settings(current_user.id):
+            # Create default if doesn't exist
+            TradingSettings.get_or_create_defaults(current_user.id)
+            g.pop('_trading_settings', None)
+        settings = _cache_settings(current_user.id)
     
-    return jsonify({
-        'success': True,
-        'data': {
-            'symbol': setting.symbol,
-            'lot_size': setting.lot_size,
-            'next_month_lot_size': setting.next_month_lot_size or setting.lot_size,
-            'freeze_quantity': setting.freeze_quantity,
-            'max_lots_per_order': setting.max_lots_per_order
-        }
-    })
+    setting = settings[symbol]
+    data = {
+        'symbol': setting['symbol'],
+        'lot_size': setting['lot_size'],
+        'next_month_lot_size': setting['next_month_lot_size'] or setting['lot_size'],
+        'freeze_quantity': setting['freeze_quantity'],
+        'max_lots_per_order': setting['max_lots_per_order']
+    }
+    
+    # ETag over the values lets repeat polls revalidate with a 304 instead of a full body
+    etag = hashlib.md5(
+        f"{data['symbol']}:{data['lot_size']}:{data['next_month_lot_size']}:"
+        f"{data['freeze_quantity']}:{data['max_lots_per_order']}".encode()
+    ).hexdigest()
+    
+    response = jsonify({'success': True, 'data': data})
+    response.set_etag(etag)
+    return response.make_conditional(request)
 
 @settings_bp.route('/reset', methods=['POST'])
 @login_required
@@ -159,11 +211,9 @@ def get_setting(symbol):
 def reset():
     """Reset settings to defaults"""
     try:
-        # Delete existing settings
-        TradingSettings.query.filter_by(user_id=current_user.id).delete()
-        
-        # Create defaults
-        TradingSettings.get_or_create_defaults(current_user.id)
+        # Reset existing settings in place (missing rows are created)
+        TradingSettings.reset_to_defaults(current_user.id)
+        _settings_cache.pop(current_user.id, None)
         
         flash('Settings reset to defaults successfully', 'success')
         return jsonify({'success': True, 'message': 'Settings reset to defaults'})
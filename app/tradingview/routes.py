@@ -7,7 +7,8 @@ from flask_login import login_required, current_user
 from app.tradingview import tradingview_bp
 from app.models import Strategy, StrategyLeg, StrategyExecution
 from app.utils.rate_limiter import api_rate_limit
-from app.utils.supertrend import calculate_supertrend
+from app.utils.supertrend import calculate_supertrend, common_index
+from app.utils.supertrend_exit_service import _entry_not_rejected, _sum_weighted_ohlc, OHLC_COLUMNS
 import logging
 import numpy as np
 import pandas as pd
@@ -120,17 +121,14 @@ def get_chart_data(strategy_id):
 
         # Filter to only legs with OPEN positions (status='entered')
         # This ensures closed legs don't affect the combined premium calculation
+        # Rejected/cancelled orders are filtered out in SQL
         open_positions = StrategyExecution.query.filter_by(
             strategy_id=strategy_id,
             status='entered'
+        ).filter(
+            _entry_not_rejected
         ).all()
 
-        # Filter out rejected/cancelled orders
-        open_positions = [
-            pos for pos in open_positions
-            if not (hasattr(pos, 'broker_order_status') and pos.broker_order_status in ['rejected', 'cancelled'])
-        ]
-
         # Get leg IDs that have open positions
         open_leg_ids = set(pos.leg_id for pos in open_positions if pos.leg_id)
 
@@ -395,76 +393,36 @@ def fetch_spread_historical_data(strategy, legs, interval='5m', days=3):
         # For Supertrend to work correctly, we need proper high/low values, not just close
         logger.debug(f"Calculating combined spread OHLC from {len(leg_data_dict)} legs...")
 
-        # Initialize combined OHLC
-        common_index = None
-        combined_open = None
-        combined_high = None
-        combined_low = None
-        combined_close = None
-
-        for leg_name, leg_info in leg_data_dict.items():
-            df = leg_info['data']
-            action = leg_info['action']
-            leg_number = leg_info['leg_number']
-
-            # Get OHLC data
-            leg_open = df['open'].copy()
-            leg_high = df['high'].copy()
-            leg_low = df['low'].copy()
-            leg_close = df['close'].copy()
-
-            # Apply sign based on action: SELL = positive, BUY = negative
-            if action == 'BUY':
-                leg_open = -leg_open
-                leg_high = -leg_high
-                leg_low = -leg_low
-                leg_close = -leg_close
-                logger.debug(f"  Leg {leg_number}: BUY (negative contribution)")
-            else:
-                logger.debug(f"  Leg {leg_number}: SELL (positive contribution)")
-
-            # Build common index (intersection of all timestamps)
-            if common_index is None:
-                common_index = df.index
-                combined_open = leg_open
-                combined_high = leg_high
-                combined_low = leg_low
-                combined_close = leg_close
-            else:
-                common_index = common_index.intersection(df.index)
-                combined_open = combined_open.add(leg_open, fill_value=0)
-                combined_high = combined_high.add(leg_high, fill_value=0)
-                combined_low = combined_low.add(leg_low, fill_value=0)
-                combined_close = combined_close.add(leg_close, fill_value=0)
-
-        if common_index is None or len(common_index) == 0:
+        # Common timestamps first (intersection of all legs), then one unweighted
+        # sum per side: SELL = positive, BUY = negative
+        index = common_index([leg_info['data'] for leg_info in leg_data_dict.values()])
+
+        if len(index) == 0:
             logger.error("No valid leg data found or no common timestamps")
             return None
 
-        # Reindex to common timestamps
-        combined_open = combined_open.reindex(common_index)
-        combined_high = combined_high.reindex(common_index)
-        combined_low = combined_low.reindex(common_index)
-        combined_close = combined_close.reindex(common_index)
+        sell_legs = [(leg_info['data'], 1) for leg_info in leg_data_dict.values() if leg_info['action'] != 'BUY']
+        buy_legs = [(leg_info['data'], 1) for leg_info in leg_data_dict.values() if leg_info['action'] == 'BUY']
+        logger.debug(f"  {len(sell_legs)} SELL leg(s) positive, {len(buy_legs)} BUY leg(s) negative")
+
+        combined = np.zeros((len(index), len(OHLC_COLUMNS)))
+        if sell_legs:
+            combined += _sum_weighted_ohlc(sell_legs, index)
+        if buy_legs:
+            combined -= _sum_weighted_ohlc(buy_legs, index)
 
         # Take absolute values for spread (spread value should be positive)
-        combined_open = combined_open.abs()
-        combined_high = combined_high.abs()
-        combined_low = combined_low.abs()
-        combined_close = combined_close.abs()
+        combined = np.abs(combined)
 
         # Ensure high >= low after abs() transformation
         # After taking absolute value, the original high/low relationship might be inverted
-        actual_high = pd.concat([combined_high, combined_low], axis=1).max(axis=1)
-        actual_low = pd.concat([combined_high, combined_low], axis=1).min(axis=1)
+        # (fmax/fmin skip NaN the way DataFrame.max/min(axis=1) did)
+        high_vals = combined[:, 1]
+        low_vals = combined[:, 2]
+        combined[:, 1], combined[:, 2] = np.fmax(high_vals, low_vals), np.fmin(high_vals, low_vals)
 
         # Create OHLC DataFrame with proper high/low for ATR calculation
-        combined_df = pd.DataFrame({
-            'open': combined_open,
-            'high': actual_high,
-            'low': actual_low,
-            'close': combined_close
-        })
+        combined_df = pd.DataFrame(combined, index=index, columns=OHLC_COLUMNS)
 
         logger.debug(f"  Combined spread OHLC with proper high/low values for Supertrend")
 
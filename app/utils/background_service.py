@@ -7,17 +7,21 @@ Uses standard threading for background tasks.
 
 import logging
 import threading
+import concurrent.futures
+import time as time_module
 from datetime import datetime, time, timedelta, date
 from typing import Optional, Dict, Any, List
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
 import pytz
 from flask import current_app
-from sqlalchemy import and_
+from sqlalchemy import and_, select
+from sqlalchemy.orm import load_only
 
 # Cross-platform compatibility
-from app.utils.compat import sleep, spawn, spawn_n, create_lock
+from app.utils.compat import spawn, spawn_n, create_lock
 
+from app import db
 from app.models import TradingAccount, TradingHoursTemplate, TradingSession, MarketHoliday, SpecialTradingSession
 from app.utils.option_chain import OptionChainManager
 from app.utils.websocket_manager import ProfessionalWebSocketManager
@@ -28,6 +32,14 @@ from app.utils.session_manager import session_manager
 
 logger = logging.getLogger(__name__)
 
+# IST timezone and default NSE market hours
+IST = pytz.timezone('Asia/Kolkata')
+MARKET_OPEN = time(9, 15)
+MARKET_CLOSE = time(15, 30)
+
+# Options exchange per underlying (anything not listed trades on NFO)
+EXCHANGE_BY_UNDERLYING = {'SENSEX': 'BFO'}
+
 
 class OptionChainBackgroundService:
     """
@@ -42,25 +54,35 @@ class OptionChainBackgroundService:
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
-                    cls._instance = super().__new__(cls)
-                    cls._instance._initialized = False
+                    # Fully build the instance before publishing it, so no thread
+                    # can observe a half-initialized singleton
+                    instance = super().__new__(cls)
+                    instance._do_init()
+                    cls._instance = instance
         return cls._instance
-    
+
     def __init__(self):
-        if self._initialized:
-            return
+        """State is built once in _do_init(); repeated construction is a no-op"""
+        pass
 
-        self.scheduler = BackgroundScheduler(timezone=pytz.timezone('Asia/Kolkata'))
-        self.active_managers = {}
+    def _do_init(self):
+        """Build service state (called once, under the class lock)"""
+        self.scheduler = BackgroundScheduler(timezone=IST)
+        self.active_managers: Dict[str, Dict[str, OptionChainManager]] = {}  # {underlying: {expiry: manager}}
         self.websocket_managers = {}
+        self._chain_locks = {}  # Per-underlying locks so concurrent starts don't duplicate managers
+        self._chain_locks_guard = threading.Lock()
+        self._expiry_cache = {}  # (underlying, IST date) -> expiry list, cleared daily
+        self._api_clients = {}  # (api_key, host) -> ExtendedOpenAlgoAPI, reused across starts and failovers
         self.is_running = False
         self.primary_account = None
         self.backup_accounts = []
-        self._initialized = True
         self.cached_holidays = {}  # Cache holidays to avoid DB queries
         self.cached_sessions = {}  # Cache trading sessions
         self.cached_special_sessions = {}  # Cache special sessions
         self.cache_refresh_time = None
+        self._trading_hours_cache = (0, False)  # (epoch second, result) - status polls hit this many times a second
+        self._holiday_cache = (0, False)
 
         # NEW: Position monitoring and risk management
         self.position_monitor_running = False
@@ -134,12 +156,7 @@ class OptionChainBackgroundService:
                         )
 
                         # Wait briefly for authentication
-                        auth_wait = 0
-                        while not ws_manager.authenticated and auth_wait < 3:
-                            sleep(0.5)
-                            auth_wait += 0.5
-
-                        if ws_manager.authenticated:
+                        if ws_manager.auth_event.wait(timeout=3):
                             logger.debug(f"WebSocket connected via account: {account.account_name}")
                             return  # Success - exit loop
                         else:
@@ -156,10 +173,7 @@ class OptionChainBackgroundService:
 
             # Only wait if blocking mode requested (for critical operations)
             if blocking:
-                auth_wait_time = 0
-                while not ws_manager.authenticated and auth_wait_time < 3:
-                    sleep(0.5)
-                    auth_wait_time += 0.5
+                ws_manager.auth_event.wait(timeout=3)
 
             return ws_manager
 
@@ -250,6 +264,18 @@ class OptionChainBackgroundService:
                 max_instances=1
             )
             logger.debug("WebSocket reconnect check scheduled (30-second interval)")
+
+            # Drop the previous day's expiry lists just after midnight
+            self.scheduler.add_job(
+                func=self._expiry_cache.clear,
+                trigger=CronTrigger(
+                    hour=0,
+                    minute=1,
+                    timezone=IST
+                ),
+                id='expiry_cache_clear',
+                replace_existing=True
+            )
     
     def stop_service(self):
         """Stop the background service"""
@@ -284,58 +310,71 @@ class OptionChainBackgroundService:
         try:
             logger.debug(f"Primary account connected: {account.account_name}")
             self.primary_account = account
+
+            # Callers run inside an app context, so bind the app here rather than
+            # relying on a startup delay for set_flask_app() to have happened
+            if not self.flask_app:
+                self.flask_app = current_app._get_current_object()
             
-            # Get backup accounts for failover
-            self.backup_accounts = TradingAccount.query.filter_by(
-                user_id=account.user_id,
-                is_active=True,
-                is_primary=False
-            ).order_by(TradingAccount.created_at).all()
+            # Get backup accounts for failover, loading only the columns failover uses
+            # (skips the large cached funds/positions/holdings JSON columns)
+            self.backup_accounts = db.session.execute(
+                select(TradingAccount).options(load_only(
+                    TradingAccount.user_id,
+                    TradingAccount.account_name,
+                    TradingAccount.host_url,
+                    TradingAccount.websocket_url,
+                    TradingAccount.api_key_encrypted,
+                    TradingAccount.is_primary
+                )).filter_by(
+                    user_id=account.user_id,
+                    is_active=True,
+                    is_primary=False
+                ).order_by(TradingAccount.created_at)
+            ).scalars().all()
             
             # Check if within trading hours
             if self.is_trading_hours():
-                # DISABLED: Automatic option chain loading (now on-demand via SessionManager)
-                # Option chains will load only when users visit /trading/option-chain
-                # This reduces WebSocket subscriptions from 1000+ to just open positions (5-50)
-
-                def start_services():
-                    sleep(2)  # Give Flask time to start
-
-                    # Run services within Flask app context
-                    if self.flask_app:
-                        with self.flask_app.app_context():
-                            # COMMENTED OUT: Automatic option chain subscriptions
-                            # self.start_option_chain('NIFTY')  # Will load 4 expiries (328 symbols)
-                            # self.start_option_chain('BANKNIFTY')  # Will load 4 expiries (328 symbols)
-                            # self.start_option_chain('SENSEX')  # Will load 4 expiries (328 symbols)
-                            # Total: ~984 symbols subscribed automatically
-
-                            logger.debug("Option chains DISABLED - using on-demand loading via SessionManager")
-
-                            # START: Position monitor and risk manager (essential services)
-                            self.start_position_monitor()
-                            self.start_risk_manager()
-
-                            # Initialize SessionManager with SHARED WebSocket manager
-                            # This ensures all services use the SAME connection
-                            if self.shared_websocket_manager:
-                                session_manager.set_websocket_manager(self.shared_websocket_manager)
-                                logger.debug("SessionManager initialized with shared WebSocket connection")
-                            else:
-                                logger.warning("No shared WebSocket manager available for SessionManager")
-
-                            logger.debug("Position monitor and risk manager started")
-                    else:
-                        logger.error("Flask app not set - cannot start services")
-
                 # Spawn background task (greenlet on Linux, thread on Windows)
-                spawn(start_services)
+                spawn(self._bootstrap_services)
             else:
                 logger.debug("Outside trading hours, services will start at market open")
                 
         except Exception as e:
             logger.error(f"Error starting option chains on account connection: {e}")
     
+    def _bootstrap_services(self):
+        """Start the essential services once a primary account is connected"""
+        if not self.flask_app:
+            logger.error("Flask app not set - cannot start services")
+            return
+
+        # Run services within Flask app context
+        with self.flask_app.app_context():
+            # DISABLED: Automatic option chain loading (now on-demand via SessionManager)
+            # Option chains will load only when users visit /trading/option-chain
+            # This reduces WebSocket subscriptions from 1000+ to just open positions (5-50)
+            # self.start_option_chain('NIFTY')  # Will load 4 expiries (328 symbols)
+            # self.start_option_chain('BANKNIFTY')  # Will load 4 expiries (328 symbols)
+            # self.start_option_chain('SENSEX')  # Will load 4 expiries (328 symbols)
+            # Total: ~984 symbols subscribed automatically
+
+            logger.debug("Option chains DISABLED - using on-demand loading via SessionManager")
+
+            # START: Position monitor and risk manager (essential services)
+            self.start_position_monitor()
+            self.start_risk_manager()
+
+            # Initialize SessionManager with SHARED WebSocket manager
+            # This ensures all services use the SAME connection
+            if self.shared_websocket_manager:
+                session_manager.set_websocket_manager(self.shared_websocket_manager)
+                logger.debug("SessionManager initialized with shared WebSocket connection")
+            else:
+                logger.warning("No shared WebSocket manager available for SessionManager")
+
+            logger.debug("Position monitor and risk manager started")
+
     def on_account_disconnected(self, account: TradingAccount):
         """
         Called when an account disconnects
@@ -358,10 +397,7 @@ class OptionChainBackgroundService:
         
         try:
             # Test connection
-            client = ExtendedOpenAlgoAPI(
-                api_key=next_account.get_api_key(),
-                host=next_account.host_url
-            )
+            client = self._get_client(next_account)
             
             ping_response = client.ping()
             if ping_response.get('status') == 'success':
@@ -369,13 +405,13 @@ class OptionChainBackgroundService:
                 self.primary_account = next_account
                 
                 # Restart all active option chains with new account
-                active_underlyings = set()
-                for key in self.active_managers.keys():
-                    underlying = key.split('_')[0]
-                    active_underlyings.add(underlying)
+                # Each restart does its own expiry HTTP call and WebSocket auth,
+                # so run them concurrently instead of one after another
+                active_underlyings = list(self.active_managers)  # keys are underlyings, no key parsing needed
                 
-                for underlying in active_underlyings:
-                    self.restart_option_chain(underlying)
+                if active_underlyings:
+                    with concurrent.futures.ThreadPoolExecutor(max_workers=len(active_underlyings)) as executor:
+                        list(executor.map(self._restart_option_chain_in_context, active_underlyings))
                 
                 logger.debug(f"Failover successful to: {next_account.account_name}")
             else:
@@ -386,8 +422,28 @@ class OptionChainBackgroundService:
             logger.error(f"Failover failed for {next_account.account_name}: {e}")
             self.attempt_failover()
     
+    def _get_client(self, account) -> ExtendedOpenAlgoAPI:
+        """Get a cached API client for the account so HTTP connections are reused"""
+        api_key = account.get_api_key()
+        key = (api_key, account.host_url)
+        client = self._api_clients.get(key)
+        if client is None:
+            client = self._api_clients.setdefault(
+                key, ExtendedOpenAlgoAPI(api_key=api_key, host=account.host_url)
+            )
+        return client
+
+    def _get_chain_lock(self, underlying: str) -> threading.Lock:
+        """Get the lock serializing option chain starts for a single underlying"""
+        with self._chain_locks_guard:
+            return self._chain_locks.setdefault(underlying, threading.Lock())
+
     def start_option_chain(self, underlying: str, expiry: str = None):
-        """Start option chain monitoring for specified underlying and expiry"""
+        """Start option chain monitoring for specified underlying and expiry
+
+        Thread-safe: different underlyings can start concurrently, while
+        starts for the same underlying are serialized.
+        """
         if not self.primary_account:
             logger.warning("No primary account available, attempting failover")
             # Try to failover to a backup account
@@ -400,51 +456,57 @@ class OptionChainBackgroundService:
             else:
                 logger.error("No primary or backup accounts available")
                 return False
-        
+
+        with self._get_chain_lock(underlying):
+            return self._start_option_chain(underlying, expiry)
+
+    def _start_option_chain(self, underlying: str, expiry: str = None):
+        """Start option chain monitoring (caller must hold the underlying's lock)"""
         try:
+            exchange = EXCHANGE_BY_UNDERLYING.get(underlying, 'NFO')
+
             # Create API client - try primary first, then backup
-            client = ExtendedOpenAlgoAPI(
-                api_key=self.primary_account.get_api_key(),
-                host=self.primary_account.host_url
-            )
+            client = self._get_client(self.primary_account)
             
             # Get expiry dates if not provided
             if not expiry:
-                expiry_response = client.expiry(
-                    symbol=underlying,
-                    exchange='BFO' if underlying == 'SENSEX' else 'NFO',
-                    instrumenttype='options'
-                )
+                # Expiries only change at rollover, so restarts and failovers reuse today's list
+                cache_key = (underlying, datetime.now(IST).date().isoformat())
+                expiries = self._expiry_cache.get(cache_key)
+                if expiries is None:
+                    expiry_response = client.expiry(
+                        symbol=underlying,
+                        exchange=exchange,
+                        instrumenttype='options'
+                    )
                 
-                # If primary fails, try backup accounts
-                if expiry_response.get('status') != 'success':
-                    logger.warning(f"Primary account failed to get expiry for {underlying}, trying backup accounts")
+                    # If primary fails, try backup accounts
+                    if expiry_response.get('status') != 'success':
+                        logger.warning(f"Primary account failed to get expiry for {underlying}, trying backup accounts")
                     
-                    for backup in self.backup_accounts:
-                        logger.debug(f"Trying backup account: {backup.account_name}")
-                        backup_client = ExtendedOpenAlgoAPI(
-                            api_key=backup.get_api_key(),
-                            host=backup.host_url
-                        )
+                        for backup in self.backup_accounts:
+                            logger.debug(f"Trying backup account: {backup.account_name}")
+                            backup_client = self._get_client(backup)
                         
-                        expiry_response = backup_client.expiry(
-                            symbol=underlying,
-                            exchange='BFO' if underlying == 'SENSEX' else 'NFO',
-                            instrumenttype='options'
-                        )
+                            expiry_response = backup_client.expiry(
+                                symbol=underlying,
+                                exchange=exchange,
+                                instrumenttype='options'
+                            )
                         
-                        if expiry_response.get('status') == 'success':
-                            logger.debug(f"Successfully got expiry from backup account: {backup.account_name}")
-                            client = backup_client  # Use backup client for further operations
-                            break
-                    else:
-                        logger.error(f"All accounts failed to get expiry for {underlying}")
-                        return False
+                            if expiry_response.get('status') == 'success':
+                                logger.debug(f"Successfully got expiry from backup account: {backup.account_name}")
+                                client = backup_client  # Use backup client for further operations
+                                break
+                        else:
+                            logger.error(f"All accounts failed to get expiry for {underlying}")
+                            return False
                 
-                expiries = expiry_response.get('data', [])
-                if not expiries:
-                    logger.error(f"No expiries available for {underlying}")
-                    return False
+                    expiries = expiry_response.get('data', [])
+                    if not expiries:
+                        logger.error(f"No expiries available for {underlying}")
+                        return False
+                    self._expiry_cache[cache_key] = expiries
                 
                 # Get first 4 expiries for streaming
                 expiries_to_use = expiries[:4] if len(expiries) >= 4 else expiries
@@ -455,10 +517,8 @@ class OptionChainBackgroundService:
             
             # Start manager for each expiry
             for exp in expiries_to_use:
-                manager_key = f"{underlying}_{exp}"
-                
-                if manager_key in self.active_managers:
-                    logger.debug(f"Option chain already running for {manager_key}")
+                if exp in self.active_managers.get(underlying, {}):
+                    logger.debug(f"Option chain already running for {underlying} {exp}")
                     continue
             
                 # Create or get WebSocket manager for this underlying
@@ -485,12 +545,7 @@ class OptionChainBackgroundService:
                             logger.debug(f"WebSocket failover occurred: now using {current_account.account_name}")
                         
                         # Wait for authentication to complete (max 5 seconds)
-                        auth_wait_time = 0
-                        while not ws_manager.authenticated and auth_wait_time < 5:
-                            sleep(0.5)
-                            auth_wait_time += 0.5
-                            
-                        if not ws_manager.authenticated:
+                        if not ws_manager.auth_event.wait(timeout=5):
                             logger.error(f"WebSocket authentication failed for {underlying} after failover attempts")
                             all_managers_started = False
                             continue
@@ -514,10 +569,10 @@ class OptionChainBackgroundService:
                 # Start monitoring
                 option_manager.start_monitoring()
                 
-                # Store managers with unique key
-                self.active_managers[manager_key] = option_manager
+                # Store managers by underlying and expiry
+                self.active_managers.setdefault(underlying, {})[exp] = option_manager
                 
-                logger.debug(f"Option chain started for {manager_key}")
+                logger.debug(f"Option chain started for {underlying} {exp}")
             
             return all_managers_started
             
@@ -530,20 +585,18 @@ class OptionChainBackgroundService:
         try:
             if expiry:
                 # Stop specific expiry
-                manager_key = f"{underlying}_{expiry}"
-                if manager_key in self.active_managers:
-                    manager = self.active_managers[manager_key]
+                managers = self.active_managers.get(underlying, {})
+                manager = managers.pop(expiry, None)
+                if manager:
                     manager.stop_monitoring()
-                    del self.active_managers[manager_key]
-                    logger.debug(f"Option chain stopped for {manager_key}")
+                    logger.debug(f"Option chain stopped for {underlying} {expiry}")
+                if not managers:
+                    self.active_managers.pop(underlying, None)
             else:
                 # Stop all expiries for this underlying
-                keys_to_remove = [k for k in self.active_managers.keys() if k.startswith(f"{underlying}_")]
-                for key in keys_to_remove:
-                    manager = self.active_managers[key]
+                for exp, manager in self.active_managers.pop(underlying, {}).items():
                     manager.stop_monitoring()
-                    del self.active_managers[key]
-                    logger.debug(f"Option chain stopped for {key}")
+                    logger.debug(f"Option chain stopped for {underlying} {exp}")
                 
                 # Disconnect WebSocket for this underlying
                 if underlying in self.websocket_managers:
@@ -559,6 +612,17 @@ class OptionChainBackgroundService:
         logger.debug(f"Restarting option chain for {underlying} {expiry or 'all expiries'}")
         self.stop_option_chain(underlying, expiry)
         self.start_option_chain(underlying, expiry)
+
+    def _restart_option_chain_in_context(self, underlying: str):
+        """Restart an option chain from a worker thread (pool threads don't inherit app context)"""
+        try:
+            if self.flask_app:
+                with self.flask_app.app_context():
+                    self.restart_option_chain(underlying)
+            else:
+                self.restart_option_chain(underlying)
+        except Exception as e:
+            logger.error(f"Error restarting option chain for {underlying}: {e}")
     
     def stop_all_option_chains(self):
         """Stop all active option chains"""
@@ -574,27 +638,39 @@ class OptionChainBackgroundService:
             # Get trading sessions from database or use defaults
             sessions = self.get_trading_sessions()
             
+            # Resolve each weekday's window (a later session for the same day wins, as before)
+            windows = {}
             for session in sessions:
                 if not session.get('is_active'):
                     continue
                     
-                day = session['day_of_week']
                 start_time = session['start_time']
                 end_time = session['end_time']
                 
                 # Schedule WebSocket start 15 minutes before market open
                 pre_market_time = (datetime.combine(date.today(), start_time) - timedelta(minutes=15)).time()
+                windows[session['day_of_week']] = (pre_market_time, start_time, end_time)
+            
+            # One pair of cron jobs per distinct window instead of one pair per weekday
+            days_by_window = {}
+            for day, window in sorted(windows.items()):
+                days_by_window.setdefault(window, []).append(day)
+            
+            self._remove_market_hours_jobs()
+            
+            for index, ((pre_market_time, start_time, end_time), days) in enumerate(days_by_window.items()):
+                day_of_week = ','.join(str(day) for day in days)
                 
                 # Schedule pre-market WebSocket start
                 self.scheduler.add_job(
                     func=self.on_pre_market_open,
                     trigger=CronTrigger(
-                        day_of_week=day,
+                        day_of_week=day_of_week,
                         hour=pre_market_time.hour,
                         minute=pre_market_time.minute,
-                        timezone=pytz.timezone('Asia/Kolkata')
+                        timezone=IST
                     ),
-                    id=f"pre_market_open_{day}",
+                    id=f"pre_market_open_{index}",
                     replace_existing=True
                 )
                 
@@ -602,16 +678,16 @@ class OptionChainBackgroundService:
                 self.scheduler.add_job(
                     func=self.on_market_close,
                     trigger=CronTrigger(
-                        day_of_week=day,
+                        day_of_week=day_of_week,
                         hour=end_time.hour,
                         minute=end_time.minute,
-                        timezone=pytz.timezone('Asia/Kolkata')
+                        timezone=IST
                     ),
-                    id=f"market_close_{day}",
+                    id=f"market_close_{index}",
                     replace_existing=True
                 )
                 
-                logger.debug(f"Scheduled {['Mon','Tue','Wed','Thu','Fri','Sat','Sun'][day]}: "
+                logger.debug(f"Scheduled {', '.join(['Mon','Tue','Wed','Thu','Fri','Sat','Sun'][day] for day in days)}: "
                           f"WebSocket {pre_market_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')} "
                           f"(Market {start_time.strftime('%H:%M')} - {end_time.strftime('%H:%M')})") 
             
@@ -624,7 +700,7 @@ class OptionChainBackgroundService:
                 trigger=CronTrigger(
                     hour=5,
                     minute=0,
-                    timezone=pytz.timezone('Asia/Kolkata')
+                    timezone=IST
                 ),
                 id="refresh_cache",
                 replace_existing=True
@@ -639,7 +715,7 @@ class OptionChainBackgroundService:
     
     def on_pre_market_open(self):
         """Called 15 minutes before market opens for service initialization"""
-        now = datetime.now(pytz.timezone('Asia/Kolkata'))
+        now = datetime.now(IST)
         logger.debug(f"Pre-market start at {now.strftime('%H:%M:%S')} - Starting services")
 
         if self.primary_account:
@@ -687,9 +763,23 @@ class OptionChainBackgroundService:
         self.stop_risk_manager()
     
     def is_trading_hours(self) -> bool:
-        """Check if current time is within trading hours (including 15-min pre-market)"""
+        """Check if current time is within trading hours (including 15-min pre-market)
+
+        Result is memoized for the current second.
+        """
+        now_s = int(time_module.time())
+        cached_at, cached_result = self._trading_hours_cache
+        if cached_at == now_s:
+            return cached_result
+
+        result = self._check_trading_hours()
+        self._trading_hours_cache = (now_s, result)
+        return result
+
+    def _check_trading_hours(self) -> bool:
+        """Evaluate trading hours against the cached sessions, holidays and special sessions"""
         try:
-            now = datetime.now(pytz.timezone('Asia/Kolkata'))
+            now = datetime.now(IST)
             current_day = now.weekday()
             current_time = now.time()
             current_date = now.date()
@@ -738,11 +828,22 @@ class OptionChainBackgroundService:
             return False
     
     def is_holiday(self, check_date: Optional[date] = None) -> bool:
-        """Check if given date is a market holiday"""
+        """Check if given date is a market holiday (today's result is memoized per second)"""
+        if check_date is None:
+            now_s = int(time_module.time())
+            cached_at, cached_result = self._holiday_cache
+            if cached_at == now_s:
+                return cached_result
+
+            result = self._check_holiday(datetime.now(IST).date())
+            self._holiday_cache = (now_s, result)
+            return result
+
+        return self._check_holiday(check_date)
+
+    def _check_holiday(self, check_date: date) -> bool:
+        """Look up a date in the cached holiday calendar"""
         try:
-            if check_date is None:
-                check_date = datetime.now(pytz.timezone('Asia/Kolkata')).date()
-            
             # Use cached holidays
             if check_date in self.cached_holidays:
                 holiday_info = self.cached_holidays[check_date]
@@ -757,28 +858,38 @@ class OptionChainBackgroundService:
             logger.error(f"Error checking holiday: {e}")
             return False
     
-    def get_status(self) -> Dict[str, Any]:
-        """Get current service status"""
-        return {
+    def get_status(self, detail: bool = False) -> Dict[str, Any]:
+        """Get current service status (per-WebSocket status only when detail=True)"""
+        status = {
             'is_running': self.is_running,
             'primary_account': self.primary_account.account_name if self.primary_account else None,
             'backup_accounts': len(self.backup_accounts),
-            'active_option_chains': list(self.active_managers.keys()),
+            'active_option_chains': self.get_active_chain_keys(),
             'is_trading_hours': self.is_trading_hours(),
-            'is_holiday': self.is_holiday(),
-            'websocket_status': {
+            'is_holiday': self.is_holiday()
+        }
+        if detail:
+            status['websocket_status'] = {
                 underlying: ws.get_status() 
                 for underlying, ws in self.websocket_managers.items()
             }
-        }
+        return status
     
+    def get_active_chain_keys(self) -> List[str]:
+        """List active option chains as 'UNDERLYING_EXPIRY' labels"""
+        return [
+            f"{underlying}_{exp}"
+            for underlying, managers in self.active_managers.items()
+            for exp in managers
+        ]
+
     def refresh_trading_hours_cache(self):
         """Refresh cached trading hours, holidays, and special sessions"""
         try:
             logger.debug("Refreshing trading hours cache")
 
             # Cache holidays for the current year
-            now = datetime.now(pytz.timezone('Asia/Kolkata'))
+            now = datetime.now(IST)
             year_start = date(now.year, 1, 1)
             year_end = date(now.year, 12, 31)
 
@@ -847,7 +958,9 @@ class OptionChainBackgroundService:
                             'is_active': session.is_active
                         })
 
-                    self.cache_refresh_time = datetime.now(pytz.timezone('Asia/Kolkata'))
+                    self.cache_refresh_time = datetime.now(IST)
+                    self._trading_hours_cache = (0, False)
+                    self._holiday_cache = (0, False)
                     logger.debug(f"Cache refreshed: {len(self.cached_holidays)} holidays, "
                               f"{len(self.cached_special_sessions)} special session dates, "
                               f"{len(self.cached_sessions)} regular sessions")
@@ -865,7 +978,7 @@ class OptionChainBackgroundService:
         """Set default NSE trading hours if database not available"""
         logger.debug("Using default NSE trading hours")
         self.cached_sessions = [
-            {'day_of_week': i, 'start_time': time(9, 15), 'end_time': time(15, 30), 'is_active': True}
+            {'day_of_week': i, 'start_time': MARKET_OPEN, 'end_time': MARKET_CLOSE, 'is_active': True}
             for i in range(5)  # Monday to Friday
         ]
         self.cached_holidays = {}
@@ -885,12 +998,12 @@ class OptionChainBackgroundService:
                     # Schedule pre-market start (15 minutes before)
                     pre_market_time = (datetime.combine(session_date, session['start_time']) - timedelta(minutes=15))
                     
-                    if pre_market_time > datetime.now(pytz.timezone('Asia/Kolkata')):
+                    if pre_market_time > datetime.now(IST):
                         self.scheduler.add_job(
                             func=self.on_special_session_start,
                             trigger='date',
                             run_date=pre_market_time,
-                            timezone=pytz.timezone('Asia/Kolkata'),
+                            timezone=IST,
                             id=f"special_start_{session_date}_{session['session_name']}",
                             replace_existing=True,
                             args=[session['session_name']]
@@ -902,7 +1015,7 @@ class OptionChainBackgroundService:
                             func=self.on_special_session_end,
                             trigger='date',
                             run_date=end_time,
-                            timezone=pytz.timezone('Asia/Kolkata'),
+                            timezone=IST,
                             id=f"special_end_{session_date}_{session['session_name']}",
                             replace_existing=True,
                             args=[session['session_name']]
@@ -935,35 +1048,41 @@ class OptionChainBackgroundService:
         logger.debug(f"Special session ended: {session_name}")
         self.stop_all_option_chains()
 
+    def _remove_market_hours_jobs(self):
+        """Drop open/close jobs from a previous schedule - fewer windows now would leave higher indexes behind"""
+        for job in self.scheduler.get_jobs():
+            if job.id.startswith(('pre_market_open_', 'market_close_')):
+                self.scheduler.remove_job(job.id)
+
     def schedule_default_hours(self):
         """Fallback to schedule default NSE hours"""
         logger.debug("Scheduling default NSE hours as fallback")
-        for day in range(5):  # Monday to Friday
-            # Schedule pre-market start (9:00 AM - 15 minutes before market)
-            self.scheduler.add_job(
-                func=self.on_pre_market_open,
-                trigger=CronTrigger(
-                    day_of_week=day,
-                    hour=9,
-                    minute=0,
-                    timezone=pytz.timezone('Asia/Kolkata')
-                ),
-                id=f"pre_market_open_{day}",
-                replace_existing=True
-            )
-
-            # Schedule market close (3:30 PM)
-            self.scheduler.add_job(
-                func=self.on_market_close,
-                trigger=CronTrigger(
-                    day_of_week=day,
-                    hour=15,
-                    minute=30,
-                    timezone=pytz.timezone('Asia/Kolkata')
-                ),
-                id=f"market_close_{day}",
-                replace_existing=True
-            )
+        self._remove_market_hours_jobs()
+        # Schedule pre-market start (9:00 AM - 15 minutes before market), Monday to Friday
+        self.scheduler.add_job(
+            func=self.on_pre_market_open,
+            trigger=CronTrigger(
+                day_of_week='mon-fri',
+                hour=9,
+                minute=0,
+                timezone=IST
+            ),
+            id="pre_market_open_0",
+            replace_existing=True
+        )
+
+        # Schedule market close (3:30 PM), Monday to Friday
+        self.scheduler.add_job(
+            func=self.on_market_close,
+            trigger=CronTrigger(
+                day_of_week='mon-fri',
+                hour=MARKET_CLOSE.hour,
+                minute=MARKET_CLOSE.minute,
+                timezone=IST
+            ),
+            id="market_close_0",
+            replace_existing=True
+        )
 
     # NEW METHODS FOR POSITION MONITORING AND RISK MANAGEMENT
 
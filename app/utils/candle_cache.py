@@ -0,0 +1,74 @@
+"""
+Candle Cache Module
+Process-wide cache of historical candles shared by the Supertrend exit checks
+"""
+
+import threading
+import time
+import logging
+from typing import Callable
+
+import pandas as pd
+from cachetools import TLRUCache
+
+from app.models import SUPERTREND_TIMEFRAME_MINUTES, DEFAULT_SUPERTREND_TIMEFRAME_MINUTES
+
+logger = logging.getLogger(__name__)
+
+
+def next_candle_boundary(interval: str, now: float = None) -> float:
+    """Epoch seconds at which the current candle of this interval closes"""
+    now = time.time() if now is None else now
+    seconds = 60 * SUPERTREND_TIMEFRAME_MINUTES.get(interval, DEFAULT_SUPERTREND_TIMEFRAME_MINUTES)
+    # IST is UTC+5:30 (330 minutes), a whole number of every Supertrend timeframe, so
+    # flooring epoch seconds lands on the same boundaries the exchange uses
+    return (now // seconds + 1) * seconds
+
+
+class CandleCache:
+    """
+    History responses keyed by (symbol, exchange, interval, start, end, boundary).
+
+    Every strategy checked inside one candle window shares a single fetch per
+    symbol; entries expire at the candle boundary baked into the key.
+    """
+
+    def __init__(self, maxsize=1024):
+        self.cache = TLRUCache(maxsize=maxsize, ttu=lambda key, value, now: key[-1], timer=time.time)
+        self.lock = threading.RLock()
+        self._fetch_locks = {}
+
+    def get_or_fetch(self, symbol: str, exchange: str, interval: str,
+                     start_date: str, end_date: str, fetch: Callable[[], object]):
+        """Return cached candles or call fetch() once, even if several threads miss together"""
+        key = (symbol, exchange, interval, start_date, end_date, next_candle_boundary(interval))
+
+        with self.lock:
+            data = self.cache.get(key)
+            if data is not None:
+                return data
+            fetch_lock = self._fetch_locks.setdefault(key, threading.Lock())
+
+        try:
+            with fetch_lock:
+                with self.lock:
+                    data = self.cache.get(key)
+                if data is not None:
+                    return data
+
+                data = fetch()
+                # Only cache real candles; error dicts should be retried by the next caller
+                if isinstance(data, pd.DataFrame) and not data.empty:
+                    with self.lock:
+                        self.cache[key] = data
+                return data
+        finally:
+            with self.lock:
+                self._fetch_locks.pop(key, None)
+
+    def clear(self):
+        with self.lock:
+            self.cache.clear()
+
+
+candle_cache = CandleCache()
@@ -14,13 +14,16 @@ This module solves the duplicate exit order problem by:
 3. Verifying with broker if exit order already exists before placing new one
 """
 
+import concurrent.futures
 import logging
+from collections import defaultdict
 from datetime import datetime, timedelta
-from typing import Dict, Optional, Tuple
+from enum import StrEnum
+from typing import Callable, Dict, Optional, Tuple
 from sqlalchemy import update as sa_update, func
 from app import db
 from app.models import StrategyExecution, TradingAccount
-from app.utils.openalgo_client import ExtendedOpenAlgoAPI
+from app.utils.openalgo_client import BookSnapshot, ExtendedOpenAlgoAPI
 
 logger = logging.getLogger(__name__)
 
@@ -29,7 +32,14 @@ EXIT_RETRY_DELAY_SECONDS = 10  # Wait 10 seconds before allowing retry
 MAX_EXIT_ATTEMPTS = 5  # Maximum number of exit attempts before marking as failed
 
 
-def atomic_claim_exit(execution_id: int, exit_reason: str) -> bool:
+class ExecStatus(StrEnum):
+    """StrategyExecution.status values used by the exit flow (members are plain str)"""
+    ENTERED = 'entered'
+    EXIT_PENDING = 'exit_pending'
+    EXITED = 'exited'
+
+
+def atomic_claim_exit(execution_id: int, exit_reason: str, now: Optional[datetime] = None) -> bool:
     """
     Atomically claim an execution for exit processing.
 
@@ -59,16 +69,16 @@ def atomic_claim_exit(execution_id: int, exit_reason: str) -> bool:
         True if this caller successfully claimed the execution for exit.
         False if another thread already claimed it or conditions not met.
     """
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
 
     try:
         result = db.session.execute(
             sa_update(StrategyExecution)
             .where(StrategyExecution.id == execution_id)
-            .where(StrategyExecution.status == 'entered')
+            .where(StrategyExecution.status == ExecStatus.ENTERED)
             .where(StrategyExecution.exit_order_id.is_(None))
             .values(
-                status='exit_pending',
+                status=ExecStatus.EXIT_PENDING,
                 exit_reason=exit_reason,
                 exit_pending_since=now,
                 exit_attempt_count=func.coalesce(StrategyExecution.exit_attempt_count, 0) + 1,
@@ -92,7 +102,7 @@ def atomic_claim_exit(execution_id: int, exit_reason: str) -> bool:
         return False
 
 
-def atomic_claim_exit_retry(execution_id: int, exit_reason: str) -> bool:
+def atomic_claim_exit_retry(execution_id: int, exit_reason: str, now: Optional[datetime] = None) -> bool:
     """
     Atomically claim an exit_pending execution for retry.
 
@@ -109,13 +119,13 @@ def atomic_claim_exit_retry(execution_id: int, exit_reason: str) -> bool:
     Returns:
         True if this caller successfully claimed the retry.
     """
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
 
     try:
         result = db.session.execute(
             sa_update(StrategyExecution)
             .where(StrategyExecution.id == execution_id)
-            .where(StrategyExecution.status == 'exit_pending')
+            .where(StrategyExecution.status == ExecStatus.EXIT_PENDING)
             .where(StrategyExecution.exit_order_id.is_(None))
             .where(StrategyExecution.exit_retry_after <= now)
             .where(StrategyExecution.exit_attempt_count < MAX_EXIT_ATTEMPTS)
@@ -142,6 +152,214 @@ def atomic_claim_exit_retry(execution_id: int, exit_reason: str) -> bool:
         return False
 
 
+def atomic_claim_exits_bulk(
+    execution_ids: list,
+    exit_reason: str,
+    retry: bool = False,
+    now: Optional[datetime] = None
+) -> set:
+    """
+    Atomically claim many executions for exit in a single UPDATE + COMMIT.
+
+    Same WHERE guards and EXIT_RETRY_DELAY_SECONDS lease as atomic_claim_exit
+    (retry=False) or atomic_claim_exit_retry (retry=True), applied to all IDs at
+    once, so a sweep over N executions costs one round-trip and one commit instead
+    of N. Callers that reach a row later than the lease allows must take it again
+    with renew_exit_claims() before placing its order.
+
+    Args:
+        execution_ids: IDs of the StrategyExecutions to claim
+        exit_reason: Reason for the exit (e.g., 'max_loss', 'supertrend_breakout')
+        retry: Claim exit_pending rows for retry instead of fresh 'entered' rows
+        now: Sweep timestamp shared by the caller (defaults to datetime.utcnow())
+
+    Returns:
+        Set of execution IDs this caller successfully claimed.
+    """
+    if not execution_ids:
+        return set()
+
+    now = now or datetime.utcnow()
+
+    if not db.session.get_bind().dialect.update_returning:
+        # No RETURNING (SQLite < 3.35): the rowcount of a per-row claim is the only
+        # reliable way to know which rows are ours
+        claim = atomic_claim_exit_retry if retry else atomic_claim_exit
+        return {execution_id for execution_id in execution_ids if claim(execution_id, exit_reason, now=now)}
+
+    stmt = (
+        sa_update(StrategyExecution)
+        .where(StrategyExecution.id.in_(execution_ids))
+        .where(StrategyExecution.exit_order_id.is_(None))
+    )
+    if retry:
+        stmt = (
+            stmt.where(StrategyExecution.status == ExecStatus.EXIT_PENDING)
+            .where(StrategyExecution.exit_retry_after <= now)
+            .where(StrategyExecution.exit_attempt_count < MAX_EXIT_ATTEMPTS)
+            .values(
+                exit_attempt_count=func.coalesce(StrategyExecution.exit_attempt_count, 0) + 1,
+                exit_retry_after=now + timedelta(seconds=EXIT_RETRY_DELAY_SECONDS),
+                exit_reason=exit_reason
+            )
+        )
+    else:
+        stmt = (
+            stmt.where(StrategyExecution.status == ExecStatus.ENTERED)
+            .values(
+                status=ExecStatus.EXIT_PENDING,
+                exit_reason=exit_reason,
+                exit_pending_since=now,
+                exit_attempt_count=func.coalesce(StrategyExecution.exit_attempt_count, 0) + 1,
+                exit_retry_after=now + timedelta(seconds=EXIT_RETRY_DELAY_SECONDS)
+            )
+        )
+
+    try:
+        claimed = set(db.session.execute(stmt.returning(StrategyExecution.id)).scalars())
+        db.session.commit()
+
+        logger.info(f"[ATOMIC_CLAIM] Bulk claimed {len(claimed)}/{len(execution_ids)} executions "
+                   f"for {'retry' if retry else 'exit'}: {exit_reason}")
+        return claimed
+
+    except Exception as e:
+        logger.error(f"[ATOMIC_CLAIM] Error bulk claiming executions {execution_ids}: {e}")
+        db.session.rollback()
+        return set()
+
+
+def renew_exit_claims(execution_ids: list, now: Optional[datetime] = None) -> set:
+    """
+    Extend the claim lease of executions this caller is about to place orders for.
+
+    Only rows whose lease has not expired yet are renewed - once it expires a retry
+    sweep may have claimed the row, so the caller must leave it to the retry path
+    (which verifies with the broker first) instead of placing a second order.
+
+    Returns:
+        Set of execution IDs that are still held by this caller.
+    """
+    if not execution_ids:
+        return set()
+
+    now = now or datetime.utcnow()
+    stmt = (
+        sa_update(StrategyExecution)
+        .where(StrategyExecution.status == ExecStatus.EXIT_PENDING)
+        .where(StrategyExecution.exit_order_id.is_(None))
+        .where(StrategyExecution.exit_retry_after > now)
+        .values(exit_retry_after=now + timedelta(seconds=EXIT_RETRY_DELAY_SECONDS))
+        .execution_options(synchronize_session=False)
+    )
+
+    try:
+        if db.session.get_bind().dialect.update_returning:
+            held = set(db.session.execute(
+                stmt.where(StrategyExecution.id.in_(execution_ids)).returning(StrategyExecution.id)
+            ).scalars())
+        else:
+            held = {
+                execution_id for execution_id in execution_ids
+                if db.session.execute(stmt.where(StrategyExecution.id == execution_id)).rowcount > 0
+            }
+        db.session.commit()
+    except Exception as e:
+        logger.error(f"[ATOMIC_CLAIM] Error renewing claims {execution_ids}: {e}")
+        db.session.rollback()
+        return set()
+
+    lost = set(execution_ids) - held
+    if lost:
+        logger.warning(f"[ATOMIC_CLAIM] Claim lease expired for executions {sorted(lost)} - left to the retry path")
+    return held
+
+
+def _new_verification_result() -> Dict:
+    return {
+        'has_exit_order': False,
+        'order_status': None,
+        'order_id': None,
+        'position_quantity': 0,
+        'can_place_exit': False,
+        'message': ''
+    }
+
+
+def _evaluate_exit_verification(
+    result: Dict,
+    execution: StrategyExecution,
+    positions: BookSnapshot,
+    orders: BookSnapshot,
+    get_trades: Callable[[], BookSnapshot]
+) -> Dict:
+    """Decide from the broker books whether an exit order may be placed (fills in result)"""
+    symbol = execution.symbol
+
+    # Determine exit action (opposite of entry). This is the only case-folding on the
+    # verification path - broker rows are normalised once per snapshot (NormalizedOrder)
+    leg = execution.leg
+    entry_action = leg.action.upper() if leg else 'BUY'
+    exit_action = 'SELL' if entry_action == 'BUY' else 'BUY'
+
+    # 1. Check positionbook for actual position
+    if positions.ok:
+        result['position_quantity'] = positions.positions_by_symbol.get(symbol, 0)
+
+    # If no position exists at broker, exit is already done
+    if result['position_quantity'] == 0:
+        result['has_exit_order'] = True
+        result['order_status'] = 'complete'
+        result['message'] = 'Position already closed at broker (quantity=0)'
+        result['can_place_exit'] = False
+        return result
+
+    # 2. Check orderbook (or the single orderstatus lookup) for pending exit orders
+    if orders.ok:
+        for order in orders.orders_by_symbol.get(symbol, ()):
+            # Check if this is an exit order for our symbol
+            if order.action == exit_action:
+                order_status = order.status
+                order_id = order.order_id
+                result['has_exit_order'] = True
+                result['order_status'] = order_status
+                result['order_id'] = order_id
+
+                if order_status == 'complete':
+                    result['message'] = f'Exit order {order_id} already completed'
+                    result['can_place_exit'] = False
+                elif order_status in ['open', 'pending', 'trigger_pending']:
+                    result['message'] = f'Exit order {order_id} is {order_status}'
+                    result['can_place_exit'] = False
+                elif order_status in ['cancelled', 'rejected']:
+                    result['message'] = f'Previous exit order {order_id} was {order_status}'
+                    result['can_place_exit'] = True
+                else:
+                    result['message'] = f'Exit order {order_id} has status: {order_status}'
+                    result['can_place_exit'] = False
+
+                return result
+
+    # 3. Check tradebook for completed exit trades (only reached when no exit order was found)
+    trades = get_trades()
+    if trades.ok:
+        for trade in trades.orders_by_symbol.get(symbol, ()):
+            if trade.action == exit_action:
+                # Found exit trade - check if it matches our expected quantity
+                if trade.quantity >= execution.quantity:
+                    result['has_exit_order'] = True
+                    result['order_status'] = 'complete'
+                    result['order_id'] = trade.order_id
+                    result['message'] = f'Exit trade {trade.order_id} found in tradebook'
+                    result['can_place_exit'] = False
+                    return result
+
+    # No exit order found - safe to place new one
+    result['can_place_exit'] = True
+    result['message'] = f'No exit order found for {symbol}, position quantity={result["position_quantity"]}'
+    return result
+
+
 def verify_exit_order_at_broker(
     client: ExtendedOpenAlgoAPI,
     execution: StrategyExecution,
@@ -150,10 +368,10 @@ def verify_exit_order_at_broker(
     """
     Verify if an exit order exists at the broker for this position.
 
-    Checks:
-    1. Orderbook - for pending/open exit orders
-    2. Tradebook - for completed exit trades
-    3. Positionbook - for actual position quantity
+    Checks (short-circuiting as soon as the decision is known):
+    1. Positionbook - for actual position quantity
+    2. Orderbook - for pending/open exit orders (orderstatus when exit_order_id is known)
+    3. Tradebook - for completed exit trades, only if no exit order was found
 
     Returns:
         Dict with:
@@ -164,100 +382,64 @@ def verify_exit_order_at_broker(
         - can_place_exit: bool - True if safe to place new exit order
         - message: str - Human-readable status
     """
-    result = {
-        'has_exit_order': False,
-        'order_status': None,
-        'order_id': None,
-        'position_quantity': 0,
-        'can_place_exit': False,
-        'message': ''
-    }
+    result = _new_verification_result()
 
     try:
-        symbol = execution.symbol
-        exchange = execution.exchange
-
-        # 1. Check positionbook for actual position
-        position_response = client.positionbook()
-        if position_response.get('status') == 'success':
-            positions = position_response.get('data', [])
-            for pos in positions:
-                if pos.get('symbol') == symbol:
-                    result['position_quantity'] = abs(int(pos.get('quantity', 0)))
-                    break
-
-        # If no position exists at broker, exit is already done
-        if result['position_quantity'] == 0:
-            result['has_exit_order'] = True
-            result['order_status'] = 'complete'
-            result['message'] = 'Position already closed at broker (quantity=0)'
-            result['can_place_exit'] = False
-            return result
-
-        # 2. Check orderbook for pending exit orders
-        orderbook_response = client.orderbook()
-        if orderbook_response.get('status') == 'success':
-            orders = orderbook_response.get('data', [])
-
-            # Determine exit action (opposite of entry)
-            entry_action = execution.leg.action.upper() if execution.leg else 'BUY'
-            exit_action = 'SELL' if entry_action == 'BUY' else 'BUY'
-
-            for order in orders:
-                order_symbol = order.get('symbol', '')
-                order_action = order.get('transaction_type', order.get('transactiontype', '')).upper()
-                order_status = order.get('order_status', order.get('status', '')).lower()
-                order_id = str(order.get('orderid', order.get('order_id', '')))
-
-                # Check if this is an exit order for our symbol
-                if order_symbol == symbol and order_action == exit_action:
-                    result['has_exit_order'] = True
-                    result['order_status'] = order_status
-                    result['order_id'] = order_id
-
-                    if order_status == 'complete':
-                        result['message'] = f'Exit order {order_id} already completed'
-                        result['can_place_exit'] = False
-                    elif order_status in ['open', 'pending', 'trigger_pending']:
-                        result['message'] = f'Exit order {order_id} is {order_status}'
-                        result['can_place_exit'] = False
-                    elif order_status in ['cancelled', 'rejected']:
-                        result['message'] = f'Previous exit order {order_id} was {order_status}'
-                        result['can_place_exit'] = True
-                    else:
-                        result['message'] = f'Exit order {order_id} has status: {order_status}'
-                        result['can_place_exit'] = False
+        # Positionbook and the order lookup are fetched concurrently so verification costs
+        # one round-trip. A known exit order is looked up directly with orderstatus instead
+        # of scanning the full orderbook. The tradebook is only fetched when neither of
+        # these settles the decision
+        with concurrent.futures.ThreadPoolExecutor(max_workers=2) as executor:
+            position_future = executor.submit(client.positionbook_cached)
+            if execution.exit_order_id:
+                order_future = executor.submit(
+                    lambda: BookSnapshot(client.orderstatus(order_id=execution.exit_order_id, strategy=strategy_name))
+                )
+            else:
+                order_future = executor.submit(client.orderbook_cached)
+            positions = position_future.result()
+            orders = order_future.result()
+
+        _evaluate_exit_verification(result, execution, positions, orders, client.tradebook_cached)
 
-                    return result
+    except Exception as e:
+        logger.error(f"[EXIT_VERIFY] Error verifying exit order for {execution.symbol}: {e}")
+        result['message'] = f'Verification error: {str(e)}'
+        # On error, be cautious - don't allow placing if we can't verify
+        result['can_place_exit'] = False
 
-        # 3. Check tradebook for completed exit trades
-        tradebook_response = client.tradebook()
-        if tradebook_response.get('status') == 'success':
-            trades = tradebook_response.get('data', [])
-
-            entry_action = execution.leg.action.upper() if execution.leg else 'BUY'
-            exit_action = 'SELL' if entry_action == 'BUY' else 'BUY'
-
-            for trade in trades:
-                trade_symbol = trade.get('symbol', '')
-                trade_action = trade.get('transaction_type', trade.get('transactiontype', '')).upper()
-                trade_id = str(trade.get('orderid', trade.get('order_id', '')))
-
-                if trade_symbol == symbol and trade_action == exit_action:
-                    # Found exit trade - check if it matches our expected quantity
-                    trade_qty = abs(int(trade.get('quantity', trade.get('filled_quantity', 0))))
-                    if trade_qty >= execution.quantity:
-                        result['has_exit_order'] = True
-                        result['order_status'] = 'complete'
-                        result['order_id'] = trade_id
-                        result['message'] = f'Exit trade {trade_id} found in tradebook'
-                        result['can_place_exit'] = False
-                        return result
-
-        # No exit order found - safe to place new one
-        result['can_place_exit'] = True
-        result['message'] = f'No exit order found for {symbol}, position quantity={result["position_quantity"]}'
+    return result
+
+
+def fetch_broker_snapshot(client: ExtendedOpenAlgoAPI) -> Dict[str, BookSnapshot]:
+    """
+    Fetch positionbook, orderbook and tradebook for one account in a single round-trip.
+
+    Used to verify many retried exits on the same account with
+    verify_exit_order_at_broker_cached() instead of fetching the books per execution.
+    """
+    with concurrent.futures.ThreadPoolExecutor(max_workers=3) as executor:
+        futures = {
+            'positions': executor.submit(client.positionbook_cached),
+            'orders': executor.submit(client.orderbook_cached),
+            'trades': executor.submit(client.tradebook_cached)
+        }
+        return {name: future.result() for name, future in futures.items()}
+
+
+def verify_exit_order_at_broker_cached(snapshot: Dict[str, BookSnapshot], execution: StrategyExecution) -> Dict:
+    """
+    Same checks as verify_exit_order_at_broker(), against a fetch_broker_snapshot() result.
+
+    Pure lookups - no broker calls. The exit order is matched by symbol/action in the
+    orderbook, so this is meant for executions without a known exit_order_id.
+    """
+    result = _new_verification_result()
 
+    try:
+        _evaluate_exit_verification(
+            result, execution, snapshot['positions'], snapshot['orders'], lambda: snapshot['trades']
+        )
     except Exception as e:
         logger.error(f"[EXIT_VERIFY] Error verifying exit order for {execution.symbol}: {e}")
         result['message'] = f'Verification error: {str(e)}'
@@ -267,7 +449,7 @@ def verify_exit_order_at_broker(
     return result
 
 
-def can_attempt_exit(execution: StrategyExecution) -> Tuple[bool, str]:
+def can_attempt_exit(execution: StrategyExecution, now: Optional[datetime] = None) -> Tuple[bool, str]:
     """
     Check if we can attempt to place an exit order for this execution.
 
@@ -281,10 +463,10 @@ def can_attempt_exit(execution: StrategyExecution) -> Tuple[bool, str]:
     Returns:
         Tuple of (can_attempt: bool, reason: str)
     """
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
 
     # Already exited
-    if execution.status == 'exited':
+    if execution.status == ExecStatus.EXITED:
         return False, 'Position already exited'
 
     # Has exit order ID - check if it succeeded
@@ -297,11 +479,11 @@ def can_attempt_exit(execution: StrategyExecution) -> Tuple[bool, str]:
         return False, f'Max exit attempts ({MAX_EXIT_ATTEMPTS}) exceeded - needs manual intervention'
 
     # Fresh entry - no exit attempted yet
-    if execution.status == 'entered' and not execution.exit_pending_since:
+    if execution.status == ExecStatus.ENTERED and not execution.exit_pending_since:
         return True, 'Fresh position - can place exit'
 
     # Exit pending - check retry timer
-    if execution.status == 'exit_pending':
+    if execution.status == ExecStatus.EXIT_PENDING:
         if execution.exit_retry_after:
             if now < execution.exit_retry_after:
                 wait_seconds = (execution.exit_retry_after - now).total_seconds()
@@ -311,7 +493,7 @@ def can_attempt_exit(execution: StrategyExecution) -> Tuple[bool, str]:
         return True, 'Retry timer expired - needs broker verification'
 
     # Status is 'entered' but has exit_pending_since - shouldn't happen, but allow
-    if execution.status == 'entered':
+    if execution.status == ExecStatus.ENTERED:
         return True, 'Status is entered - can place exit'
 
     return False, f'Unknown status: {execution.status}'
@@ -320,7 +502,8 @@ def can_attempt_exit(execution: StrategyExecution) -> Tuple[bool, str]:
 def mark_exit_pending(
     execution: StrategyExecution,
     exit_reason: str,
-    increment_attempt: bool = True
+    increment_attempt: bool = True,
+    now: Optional[datetime] = None
 ) -> None:
     """
     Mark an execution as exit pending with retry tracking.
@@ -328,9 +511,9 @@ def mark_exit_pending(
     This is called BEFORE attempting to place the exit order.
     Sets status to 'exit_pending' and records the attempt.
     """
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
 
-    execution.status = 'exit_pending'
+    execution.status = ExecStatus.EXIT_PENDING
     execution.exit_reason = exit_reason
 
     # Set pending since on first attempt only
@@ -355,7 +538,9 @@ def mark_exit_pending(
 
 def mark_exit_success(
     execution: StrategyExecution,
-    order_id: str
+    order_id: str,
+    commit: bool = True,
+    now: Optional[datetime] = None
 ) -> None:
     """
     Mark an exit order as successfully placed.
@@ -363,14 +548,15 @@ def mark_exit_success(
     Note: Status stays as 'exit_pending' until order_status_poller
     confirms the order is complete and updates to 'exited'.
     """
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
 
     execution.exit_order_id = order_id
     execution.broker_order_status = 'open'
     execution.exit_time = now
     execution.exit_broker_verified = False  # Will be verified by poller
 
-    db.session.commit()
+    if commit:
+        db.session.commit()
 
     logger.info(f"[EXIT_SUCCESS] Execution {execution.id} ({execution.symbol}) exit order placed: {order_id}")
 
@@ -378,7 +564,8 @@ def mark_exit_success(
 def mark_exit_failed(
     execution: StrategyExecution,
     error_message: str,
-    needs_broker_verification: bool = True
+    needs_broker_verification: bool = True,
+    now: Optional[datetime] = None
 ) -> None:
     """
     Mark an exit attempt as failed.
@@ -393,12 +580,13 @@ def mark_exit_failed(
         execution: The execution to update
         error_message: Error message from the failed attempt
         needs_broker_verification: If True, next retry must verify with broker first
+        now: Sweep timestamp shared by the caller (defaults to datetime.utcnow())
     """
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
 
     # CRITICAL: Keep status as 'exit_pending' - DO NOT revert to 'entered'
     # This is the key fix for the duplicate exit order problem
-    execution.status = 'exit_pending'
+    execution.status = ExecStatus.EXIT_PENDING
 
     # Update error message
     execution.error_message = error_message[:500] if error_message else None
@@ -415,10 +603,54 @@ def mark_exit_failed(
                   f"Retry allowed after {execution.exit_retry_after}")
 
 
+def mark_exits_failed_bulk(
+    execution_ids: list,
+    error_message: str,
+    now: Optional[datetime] = None,
+    commit: bool = True
+) -> int:
+    """
+    Mark many failed exit attempts in one UPDATE (+ COMMIT unless commit=False).
+
+    Bulk counterpart of mark_exit_failed(needs_broker_verification=True) for sweeps
+    where several exits fail together (e.g. broker outage). Only rows still in
+    EXIT_PENDING without an exit order are touched - anything that got an order
+    or was confirmed closed in the meantime is left alone.
+
+    Returns:
+        Number of executions updated.
+    """
+    if not execution_ids:
+        return 0
+
+    now = now or datetime.utcnow()
+    retry_after = now + timedelta(seconds=EXIT_RETRY_DELAY_SECONDS)
+
+    result = db.session.execute(
+        sa_update(StrategyExecution)
+        .where(StrategyExecution.id.in_(execution_ids))
+        .where(StrategyExecution.status == ExecStatus.EXIT_PENDING)
+        .where(StrategyExecution.exit_order_id.is_(None))
+        .values(
+            error_message=error_message[:500] if error_message else None,
+            exit_retry_after=retry_after,
+            exit_broker_verified=False
+        )
+    )
+    if commit:
+        db.session.commit()
+
+    logger.warning(f"[EXIT_FAILED] {result.rowcount} executions exit failed: {error_message}. "
+                  f"Retry allowed after {retry_after}")
+    return result.rowcount
+
+
 def mark_exit_confirmed(
     execution: StrategyExecution,
     broker_status: str,
-    order_id: str = None
+    order_id: str = None,
+    commit: bool = True,
+    now: Optional[datetime] = None
 ) -> None:
     """
     Mark an exit as confirmed by broker verification.
@@ -427,9 +659,9 @@ def mark_exit_confirmed(
     This updates the execution to 'exited' status even if order_status_poller
     hasn't processed it yet.
     """
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
 
-    execution.status = 'exited'
+    execution.status = ExecStatus.EXITED
     execution.broker_order_status = broker_status
     if order_id:
         execution.exit_order_id = order_id
@@ -437,12 +669,13 @@ def mark_exit_confirmed(
         execution.exit_time = now
     execution.exit_broker_verified = True
 
-    db.session.commit()
+    if commit:
+        db.session.commit()
 
     logger.info(f"[EXIT_CONFIRMED] Execution {execution.id} ({execution.symbol}) exit confirmed via broker verification")
 
 
-def get_pending_exit_retries(strategy_id: int) -> list:
+def get_pending_exit_retries(strategy_id: int, now: Optional[datetime] = None) -> list:
     """
     Get executions that are ready for exit retry.
 
@@ -452,14 +685,41 @@ def get_pending_exit_retries(strategy_id: int) -> list:
     - exit_retry_after has passed (cooldown expired)
     - exit_attempt_count < MAX_EXIT_ATTEMPTS
     """
-    now = datetime.utcnow()
+    now = now or datetime.utcnow()
 
     executions = StrategyExecution.query.filter(
         StrategyExecution.strategy_id == strategy_id,
-        StrategyExecution.status == 'exit_pending',
+        StrategyExecution.status == ExecStatus.EXIT_PENDING,
         StrategyExecution.exit_order_id.is_(None),
         StrategyExecution.exit_retry_after <= now,
         StrategyExecution.exit_attempt_count < MAX_EXIT_ATTEMPTS
     ).all()
 
     return executions
+
+
+def get_pending_exit_retries_by_strategy(strategy_ids, now: Optional[datetime] = None) -> Dict[int, list]:
+    """
+    get_pending_exit_retries for several strategies in one query.
+
+    Returns:
+        {strategy_id: [executions ready for retry]} - strategies with none are absent
+    """
+    strategy_ids = list(strategy_ids)
+    if not strategy_ids:
+        return {}
+
+    now = now or datetime.utcnow()
+
+    executions = StrategyExecution.query.filter(
+        StrategyExecution.strategy_id.in_(strategy_ids),
+        StrategyExecution.status == ExecStatus.EXIT_PENDING,
+        StrategyExecution.exit_order_id.is_(None),
+        StrategyExecution.exit_retry_after <= now,
+        StrategyExecution.exit_attempt_count < MAX_EXIT_ATTEMPTS
+    ).all()
+
+    by_strategy = defaultdict(list)
+    for execution in executions:
+        by_strategy[execution.strategy_id].append(execution)
+    return dict(by_strategy)
@@ -4,7 +4,8 @@ Handles automatic split order placement when quantity exceeds freeze limits
 """
 
 import logging
-from typing import Dict, Tuple
+from collections import defaultdict, deque
+from typing import Dict, List, Tuple
 from app.models import TradingSettings
 
 logger = logging.getLogger(__name__)
@@ -156,3 +157,65 @@ def place_order_with_freeze_check(client, user_id: int, **order_params) -> Dict:
         # Use regular placeorder
         logger.debug(f"Placing regular order: {quantity} qty")
         return client.placeorder(**order_params)
+
+
+def place_orders_with_freeze_check(client, user_id: int, strategy: str, orders: List[Dict]) -> List[Dict]:
+    """
+    Place several MARKET orders for one account, batching them into a single basketorder call
+
+    Orders that exceed the freeze limit (splitorder) or have an invalid quantity go
+    through place_order_with_freeze_check individually; a lone order is placed directly.
+
+    Args:
+        client: ExtendedOpenAlgoAPI instance
+        user_id: User ID
+        strategy: Strategy name sent with the orders
+        orders: placeorder-style dicts (symbol, exchange, action, quantity, price_type, product)
+
+    Returns:
+        One placeorder-style response dict per order, in the same order
+    """
+    responses = [None] * len(orders)
+    basket = []
+    for i, order in enumerate(orders):
+        quantity = int(order.get('quantity', 0))
+        if quantity > 0 and not should_split_order(user_id, order['symbol'], quantity)[0]:
+            basket.append(i)
+        else:
+            responses[i] = place_order_with_freeze_check(client, user_id, strategy=strategy, **order)
+
+    if len(basket) == 1:
+        i = basket[0]
+        responses[i] = place_order_with_freeze_check(client, user_id, strategy=strategy, **orders[i])
+    elif basket:
+        basket_orders = [{
+            'symbol': orders[i]['symbol'],
+            'exchange': orders[i]['exchange'],
+            'action': orders[i]['action'],
+            'quantity': orders[i]['quantity'],
+            'pricetype': orders[i].get('price_type', 'MARKET'),
+            'product': orders[i].get('product', 'MIS')
+        } for i in basket]
+        logger.debug(f"Placing basket order: {len(basket_orders)} orders")
+        try:
+            response = client.basketorder(strategy=strategy, orders=basket_orders)
+        except Exception as e:
+            response = {'status': 'error', 'message': f'API error: {e}'}
+        if not isinstance(response, dict):
+            response = {'status': 'error', 'message': 'Invalid basket response'}
+
+        # Results carry the symbol but are not guaranteed to keep request order
+        results_by_symbol = defaultdict(deque)
+        for result in response.get('results') or []:
+            results_by_symbol[result.get('symbol')].append(result)
+
+        for i in basket:
+            pending = results_by_symbol[orders[i]['symbol']]
+            result = pending.popleft() if pending else None
+            if result and result.get('status') == 'success' and result.get('orderid'):
+                responses[i] = {'status': 'success', 'orderid': result['orderid']}
+            else:
+                message = (result or {}).get('message') or response.get('message') or 'No result in basket response'
+                responses[i] = {'status': 'error', 'message': message, 'orderid': None}
+
+    return responses
@@ -1,9 +1,125 @@
 """
 Extended OpenAlgo API client with additional methods
 """
+import sys
+import threading
+import time
+from dataclasses import dataclass
+
 import httpx
 from openalgo import api
 
+try:
+    import h2  # noqa: F401  (optional, enables HTTP/2 on the shared client)
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+# Broker books fetched within this window are reused by every client for the same account,
+# so a sweep over many executions fetches each book once rather than once per execution
+BOOK_CACHE_TTL = 1.5
+
+# Idle connections are kept this long (httpx default: 5s) so the once-a-minute monitor
+# cycles, and the exit orders they trigger, reuse a warm connection instead of a new handshake
+KEEPALIVE_EXPIRY_SECONDS = 90
+
+
+@dataclass(slots=True)
+class NormalizedOrder:
+    """Order/trade row with the broker's field-name variants resolved once"""
+    symbol: str
+    action: str
+    status: str
+    order_id: str
+    quantity: int
+
+    @classmethod
+    def from_row(cls, row):
+        return cls(
+            symbol=row.get('symbol', ''),
+            action=(row.get('transaction_type') or row.get('transactiontype') or row.get('action') or '').upper(),
+            status=(row.get('order_status') or row.get('status') or '').lower(),
+            order_id=str(row.get('orderid', row.get('order_id', ''))),
+            quantity=abs(int(row.get('quantity', row.get('filled_quantity', 0)) or 0))
+        )
+
+
+class BookSnapshot:
+    """A broker book response with a lazily built symbol -> rows index"""
+
+    def __init__(self, response):
+        self.response = response
+        self._by_symbol = None
+        self._orders_by_symbol = None
+        self._positions_by_symbol = None
+
+    @property
+    def ok(self):
+        return self.response.get('status') == 'success'
+
+    @property
+    def rows(self):
+        """Book rows as a list (orderbook nests them under data.orders, orderstatus returns one dict)"""
+        data = self.response.get('data') or []
+        if isinstance(data, dict):
+            if 'orders' in data:
+                return data['orders'] or []
+            return [data] if 'symbol' in data else []
+        return data
+
+    @property
+    def by_symbol(self):
+        """Rows grouped by symbol, built once per snapshot so each lookup is O(1)"""
+        if self._by_symbol is None:
+            index = {}
+            for row in self.rows:
+                index.setdefault(sys.intern(row.get('symbol', '')), []).append(row)
+            self._by_symbol = index
+        return self._by_symbol
+
+    @property
+    def positions_by_symbol(self):
+        """Absolute position quantity per symbol (first row wins), converted once per snapshot"""
+        if self._positions_by_symbol is None:
+            self._positions_by_symbol = {
+                symbol: abs(int(rows[0].get('quantity', 0)))
+                for symbol, rows in self.by_symbol.items()
+            }
+        return self._positions_by_symbol
+
+    @property
+    def orders_by_symbol(self):
+        """Order/trade rows normalised to NormalizedOrder and grouped by symbol"""
+        if self._orders_by_symbol is None:
+            self._orders_by_symbol = {
+                symbol: [NormalizedOrder.from_row(row) for row in rows]
+                for symbol, rows in self.by_symbol.items()
+            }
+        return self._orders_by_symbol
+
+
+class BrokerSnapshotCache:
+    """Short-lived cache of successful book snapshots keyed by (api_key, host, endpoint)"""
+
+    def __init__(self, ttl=BOOK_CACHE_TTL):
+        self.ttl = ttl
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry and time.monotonic() - entry[0] < self.ttl:
+            return entry[1]
+        return None
+
+    def put(self, key, snapshot):
+        with self._lock:
+            self._entries[key] = (time.monotonic(), snapshot)
+
+
+broker_snapshot_cache = BrokerSnapshotCache()
+
 
 class ExtendedOpenAlgoAPI(api):
     """Extended OpenAlgo API client with ping method and optimized timeout"""
@@ -15,12 +131,36 @@ class ExtendedOpenAlgoAPI(api):
         """
         super().__init__(api_key, host, version, ws_port, ws_url)
         self.timeout = timeout
+        # Persistent client keeps connections alive across calls on a reused instance.
+        # httpx.Client is thread-safe, so one instance can serve concurrent book fetches.
+        self._client = httpx.Client(
+            http2=HTTP2_AVAILABLE,
+            timeout=timeout,
+            headers=self.headers,
+            limits=httpx.Limits(
+                max_keepalive_connections=32,
+                max_connections=64,
+                keepalive_expiry=KEEPALIVE_EXPIRY_SECONDS
+            )
+        )
+
+    def close(self):
+        """Release pooled connections held by this client"""
+        client = getattr(self, '_client', None)
+        if client is not None and not client.is_closed:
+            client.close()
+
+    def __del__(self):
+        try:
+            self.close()
+        except Exception:
+            pass
 
     def _make_request(self, endpoint, payload):
         """Override to guarantee timeout is applied regardless of SDK version"""
         url = self.base_url + endpoint
         try:
-            response = httpx.post(url, json=payload, headers=self.headers, timeout=self.timeout)
+            response = self._client.post(url, json=payload)
             return self._handle_response(response)
         except httpx.TimeoutException:
             return {
@@ -47,6 +187,29 @@ class ExtendedOpenAlgoAPI(api):
                 'error_type': 'unknown_error'
             }
 
+    def _cached_book(self, endpoint, fetch):
+        """Return a recent BookSnapshot of a broker book, fetching it if the cached copy is stale"""
+        key = (self.api_key, self.base_url, endpoint)
+        snapshot = broker_snapshot_cache.get(key)
+        if snapshot is None:
+            snapshot = BookSnapshot(fetch())
+            # Only successful snapshots are shared; errors are retried on the next call
+            if snapshot.ok:
+                broker_snapshot_cache.put(key, snapshot)
+        return snapshot
+
+    def positionbook_cached(self):
+        """positionbook() served from the short-lived snapshot cache"""
+        return self._cached_book('positionbook', self.positionbook)
+
+    def orderbook_cached(self):
+        """orderbook() served from the short-lived snapshot cache"""
+        return self._cached_book('orderbook', self.orderbook)
+
+    def tradebook_cached(self):
+        """tradebook() served from the short-lived snapshot cache"""
+        return self._cached_book('tradebook', self.tradebook)
+
     def ping(self):
         """
         Test connectivity and validate API key authentication
@@ -94,6 +94,29 @@ class OrderStatusPoller:
             logger.debug(f"[POLLER] Added order {order_id} (execution {execution_id}) to polling queue. "
                        f"Queue size: {len(self.pending_orders)}")
 
+    def add_orders(self, orders):
+        """Add many (execution_id, account, order_id, strategy_name) orders under one lock"""
+        now = datetime.utcnow()
+        entries = {
+            execution_id: {
+                'account_id': account.id,
+                'account_name': account.account_name,
+                'api_key': account.get_api_key(),
+                'host_url': account.host_url,
+                'order_id': order_id,
+                'strategy_name': strategy_name,
+                'added_time': now,
+                'check_count': 0
+            }
+            for execution_id, account, order_id, strategy_name in orders
+        }
+        if not entries:
+            return
+        with self._lock:
+            self.pending_orders.update(entries)
+            logger.debug(f"[POLLER] Added {len(entries)} orders to polling queue. "
+                       f"Queue size: {len(self.pending_orders)}")
+
     def remove_order(self, execution_id: int):
         """Remove an order from the polling queue"""
         with self._lock:
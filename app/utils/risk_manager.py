@@ -31,9 +31,9 @@ from app.models import (
 )
 from app.utils.openalgo_client import ExtendedOpenAlgoAPI
 from app.utils.exit_order_manager import (
-    can_attempt_exit, mark_exit_pending, mark_exit_success, mark_exit_failed,
+    can_attempt_exit, mark_exit_pending, mark_exit_success,
     mark_exit_confirmed, verify_exit_order_at_broker, get_pending_exit_retries,
-    atomic_claim_exit, atomic_claim_exit_retry,
+    atomic_claim_exits_bulk, mark_exits_failed_bulk, renew_exit_claims,
     EXIT_RETRY_DELAY_SECONDS, MAX_EXIT_ATTEMPTS
 )
 
@@ -1136,6 +1136,7 @@ class RiskManager:
             exit_order_ids = []
             success_count = 0
             fail_count = 0
+            failed_exits = {}  # error message -> execution IDs
 
             # Close each position with freeze-aware placement and retry logic
             from app.utils.freeze_quantity_handler import place_order_with_freeze_check
@@ -1160,26 +1161,31 @@ class RiskManager:
             # Get execution IDs for row locking (we'll re-query each with lock)
             execution_ids = [ex.id for ex in ordered_executions]
 
+            # ATOMIC DUPLICATE PREVENTION: Claim every execution in one SQL UPDATE.
+            # Only ONE thread/service can claim a row - all others miss it and skip.
+            # This replaces the old can_attempt_exit() + mark_exit_pending() two-step
+            # which had a TOCTOU race condition (especially on SQLite where
+            # with_for_update() is a no-op).
+            # The claim takes its own timestamp: the tick's `now` may be several closes old,
+            # and a lease based on it could already be expired
+            claimed_ids = atomic_claim_exits_bulk(
+                execution_ids, risk_event.event_type, retry=is_retry_event
+            )
+            held_ids = set(claimed_ids)  # claims whose lease is still ours
+
             for idx, exec_id in enumerate(execution_ids):
                 # Log phase transitions
                 if idx == sell_count and sell_positions and buy_positions:
                     logger.debug(f"[RISK EXIT PHASE 2] All SELL positions closed. Starting BUY position exits...")
                     print(f"[RISK EXIT PHASE 2] All SELL positions closed. Starting BUY position exits...")
+                    # The SELL phase's broker calls can outlast the claim lease - renew it once
+                    # for the whole BUY phase and leave expired rows to the retry path
+                    held_ids = renew_exit_claims([i for i in execution_ids[sell_count:] if i in claimed_ids])
 
                 try:
                     logger.debug(f"[RISK EXIT] Processing execution {idx + 1}/{len(execution_ids)}: ID={exec_id}")
 
-                    # ATOMIC DUPLICATE PREVENTION: Single SQL UPDATE claims this execution.
-                    # Only ONE thread/service can succeed - all others get rowcount=0 and skip.
-                    # This replaces the old can_attempt_exit() + mark_exit_pending() two-step
-                    # which had a TOCTOU race condition (especially on SQLite where
-                    # with_for_update() is a no-op).
-                    if is_retry_event:
-                        claimed = atomic_claim_exit_retry(exec_id, risk_event.event_type)
-                    else:
-                        claimed = atomic_claim_exit(exec_id, risk_event.event_type)
-
-                    if not claimed:
+                    if exec_id not in claimed_ids:
                         logger.info(f"[RISK EXIT] SKIPPING execution {exec_id}: atomic claim failed "
                                    f"(already claimed by another thread/service or not eligible)")
                         print(f"[RISK EXIT] SKIPPING execution {exec_id}: already claimed or not eligible")
@@ -1269,9 +1275,9 @@ class RiskManager:
 
                     # Reverse transaction type for exit (get action from leg)
                     leg_action = execution.leg.action.upper() if execution.leg else 'BUY'
-                    exit_transaction = 'SELL' if leg_action == 'BUY' else 'BUY'
+                    exit_action = 'SELL' if leg_action == 'BUY' else 'BUY'
 
-                    logger.debug(f"[RISK EXIT] Placing {exit_transaction} order for {exec_symbol}, qty={exec_quantity} on {account.account_name}")
+                    logger.debug(f"[RISK EXIT] Placing {exit_action} order for {exec_symbol}, qty={exec_quantity} on {account.account_name}")
 
                     # Get product type - prefer execution's product, fallback to strategy's product_order_type
                     # This ensures NRML entries exit as NRML, not MIS
@@ -1279,8 +1285,12 @@ class RiskManager:
                     logger.debug(f"[RISK EXIT] Product type: execution.product='{exec_product}', strategy.product_order_type='{strategy.product_order_type}', exit_product='{exit_product}'")
 
                     # Log the exact order parameters being sent
-                    logger.info(f"[RISK EXIT] ORDER PARAMS: symbol={exec_symbol}, action={exit_transaction}, qty={exec_quantity}, exchange={exec_exchange}, product={exit_product}")
-                    print(f"[RISK EXIT] Placing order: {exit_transaction} {exec_quantity} {exec_symbol} on {account.account_name}")
+                    logger.info(f"[RISK EXIT] ORDER PARAMS: symbol={exec_symbol}, action={exit_action}, qty={exec_quantity}, exchange={exec_exchange}, product={exit_product}")
+                    print(f"[RISK EXIT] Placing order: {exit_action} {exec_quantity} {exec_symbol} on {account.account_name}")
+
+                    if exec_id not in held_ids:
+                        logger.warning(f"[RISK EXIT] SKIPPING execution {exec_id}: claim lease expired - left to retry")
+                        continue
 
                     # Place exit order ONCE - no internal retry loop
                     # If this fails, the external retry mechanism (10 seconds later) will handle it
@@ -1293,7 +1303,7 @@ class RiskManager:
                             strategy=strategy.name,
                             symbol=exec_symbol,
                             exchange=exec_exchange,
-                            action=exit_transaction,
+                            action=exit_action,
                             quantity=exec_quantity,
                             price_type='MARKET',
                             product=exit_product
@@ -1343,8 +1353,9 @@ class RiskManager:
 
                         # DUPLICATE PREVENTION: Mark exit as failed but keep status as 'exit_pending'
                         # This prevents duplicate orders - the retry mechanism will verify with broker
-                        # before placing another order after the retry delay (10 seconds)
-                        mark_exit_failed(execution, error_msg, needs_broker_verification=True)
+                        # before placing another order after the retry delay (10 seconds).
+                        # Failures are marked together after the loop, one UPDATE per distinct error
+                        failed_exits.setdefault(error_msg, []).append(exec_id)
 
                 except Exception as e:
                     fail_count += 1
@@ -1352,6 +1363,13 @@ class RiskManager:
                     print(f"[RISK EXIT] EXCEPTION: execution {exec_id} - {e}")
                     db.session.rollback()  # Release any locks on exception
 
+            for error_msg, failed_ids in failed_exits.items():
+                try:
+                    mark_exits_failed_bulk(failed_ids, error_msg)
+                except Exception as e:
+                    logger.error(f"[RISK EXIT] Failed to mark executions {failed_ids} as failed: {e}", exc_info=True)
+                    db.session.rollback()  # Rows stay exit_pending; the retry sweep picks them up
+
             # Update risk event with order IDs
             risk_event.exit_order_ids = exit_order_ids
             db.session.add(risk_event)
@@ -1409,6 +1427,10 @@ class RiskManager:
                         f"max_profit={strategy.max_profit}, trailing_sl={strategy.trailing_sl}, "
                         f"auto_exit_loss={strategy.auto_exit_on_max_loss}, auto_exit_profit={strategy.auto_exit_on_max_profit}")
 
+            # One timestamp for every retry-window check in this tick (window only -
+            # each close takes a fresh timestamp for its claim lease)
+            now = datetime.utcnow()
+
             # Check max loss
             risk_event = self.check_max_loss(strategy)
             if risk_event:
@@ -1422,7 +1444,7 @@ class RiskManager:
                 # RETRY MECHANISM: If max loss was already triggered but positions still pending, retry with broker verification
                 if strategy.max_loss_triggered_at:
                     # Get positions ready for exit retry (exit_pending with expired retry timer)
-                    pending_retries = get_pending_exit_retries(strategy.id)
+                    pending_retries = get_pending_exit_retries(strategy.id, now=now)
                     if pending_retries:
                         logger.debug(f"[MAX LOSS RETRY] Strategy {strategy.name}: {len(pending_retries)} positions ready for retry")
                         retry_event = RiskEvent(
@@ -1448,7 +1470,7 @@ class RiskManager:
                 # RETRY MECHANISM: If max profit was already triggered but positions still pending, retry with broker verification
                 if strategy.max_profit_triggered_at:
                     # Get positions ready for exit retry (exit_pending with expired retry timer)
-                    pending_retries = get_pending_exit_retries(strategy.id)
+                    pending_retries = get_pending_exit_retries(strategy.id, now=now)
                     if pending_retries:
                         logger.debug(f"[MAX PROFIT RETRY] Strategy {strategy.name}: {len(pending_retries)} positions ready for retry")
                         retry_event = RiskEvent(
@@ -1475,7 +1497,7 @@ class RiskManager:
                 # RETRY MECHANISM: If TSL was already triggered but positions still pending, retry with broker verification
                 if strategy.trailing_sl_triggered_at:
                     # Get positions ready for exit retry (exit_pending with expired retry timer)
-                    pending_retries = get_pending_exit_retries(strategy.id)
+                    pending_retries = get_pending_exit_retries(strategy.id, now=now)
                     if pending_retries:
                         logger.warning(f"[TSL RETRY] Strategy {strategy.name}: {len(pending_retries)} positions ready for retry")
                         print(f"[TSL RETRY] Strategy {strategy.name}: {len(pending_retries)} positions ready for retry")
@@ -1305,9 +1305,9 @@ class StrategyExecutor:
                     return price_info['ltp']
 
             # Check option chain service for cached underlying price
-            underlying_key = f"{instrument}_spot"
-            if underlying_key in option_chain_service.active_managers:
-                manager = option_chain_service.active_managers[underlying_key]
+            managers = option_chain_service.active_managers.get(instrument, {})
+            if managers:
+                manager = next(iter(managers.values()), None)
                 if manager and manager.underlying_ltp > 0:
                     logger.debug(f"Using option chain price for {instrument}: {manager.underlying_ltp}")
                     return manager.underlying_ltp
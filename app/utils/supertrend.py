@@ -7,12 +7,21 @@ Direction convention (matching Pine Script/TradingView):
     - direction = 1: Bearish (Down direction, red) - price below supertrend
     - direction = 0/NaN: No signal (warmup period)
 """
+import os
+import threading
+from collections import OrderedDict
+
 import numpy as np
 import pandas as pd
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Per-series Supertrend state for calculate_supertrend_incremental, most recently used last
+INCREMENTAL_CACHE_SIZE = 256
+_incremental_states = OrderedDict()
+_incremental_lock = threading.Lock()
+
 
 def calculate_supertrend(high, low, close, period=7, multiplier=3):
     """
@@ -36,42 +45,32 @@ def calculate_supertrend(high, low, close, period=7, multiplier=3):
     try:
         from openalgo import ta
 
-        # Create DataFrame for easy calculation
-        df = pd.DataFrame({
-            'high': high,
-            'low': low,
-            'close': close
-        })
+        # Numba compiles one specialization per argument type, so an int multiplier
+        # (the default) and a float one (from strategy settings) would each pay the JIT cost
+        period = int(period)
+        multiplier = float(multiplier)
+
+        # Hand plain float64 arrays to the kernel - ATR, bands and trailing all run in one
+        # Numba pass, and ndarray input skips the DataFrame/Series wrapping around it.
+        # Stay in float64: the kernel allocates its ATR/band buffers as float64 regardless of
+        # input dtype, so float32 input only adds a conversion pass (and a second JIT specialization)
+        high = np.ascontiguousarray(high, dtype=np.float64)
+        low = np.ascontiguousarray(low, dtype=np.float64)
+        close = np.ascontiguousarray(close, dtype=np.float64)
 
         # Use OpenAlgo's ta.supertrend - matches TradingView exactly
-        df['supertrend'], df['direction'] = ta.supertrend(
-            df['high'], df['low'], df['close'],
+        trend, direction_raw = ta.supertrend(
+            high, low, close,
             period=period, multiplier=multiplier
         )
 
-        # Convert to numpy arrays
-        trend = df['supertrend'].values
-        direction_raw = df['direction'].values
-
         # Convert direction: NaN -> 0, keep -1 and 1
-        direction = np.zeros(len(direction_raw), dtype=np.int32)
-        for i in range(len(direction_raw)):
-            if pd.isna(direction_raw[i]):
-                direction[i] = 0  # No signal (warmup)
-            else:
-                direction[i] = int(direction_raw[i])
-
-        # Create long/short arrays for compatibility
-        n = len(trend)
-        long = np.full(n, np.nan)
-        short = np.full(n, np.nan)
-
-        for i in range(n):
-            if not np.isnan(trend[i]):
-                if direction[i] == -1:  # Bullish
-                    long[i] = trend[i]
-                elif direction[i] == 1:  # Bearish
-                    short[i] = trend[i]
+        direction = np.nan_to_num(direction_raw, nan=0.0).astype(np.int32)
+
+        # Create long/short arrays for compatibility - split the trend line by direction
+        # in one vectorized pass (NaN trend values stay NaN on both sides)
+        long = np.where(direction == -1, trend, np.nan)  # Bullish
+        short = np.where(direction == 1, trend, np.nan)  # Bearish
 
         logger.debug(f"Supertrend calculated using OpenAlgo ta: period={period}, multiplier={multiplier}")
 
@@ -89,6 +88,123 @@ def calculate_supertrend(high, low, close, period=7, multiplier=3):
         return nan_array, np.zeros(n, dtype=np.int32), nan_array, nan_array
 
 
+def _supertrend_step(state, high, low, close, prev_close, period, multiplier):
+    """
+    Advance Supertrend by one bar - the same recurrence as OpenAlgo's kernel, so values
+    match a full recompute to within float rounding
+    """
+    tr = max(high - low, abs(high - prev_close), abs(low - prev_close))
+    atr = (state['atr'] * (period - 1) + tr) / period
+
+    hl_avg = (high + low) / 2.0
+    upper_band = hl_avg + multiplier * atr
+    lower_band = hl_avg - multiplier * atr
+
+    prev_upper = state['final_upper']
+    prev_lower = state['final_lower']
+    final_lower = lower_band if (lower_band > prev_lower or prev_close < prev_lower) else prev_lower
+    final_upper = upper_band if (upper_band < prev_upper or prev_close > prev_upper) else prev_upper
+
+    if state['trend'] == prev_upper:
+        direction = -1 if close > final_upper else 1
+    else:
+        direction = 1 if close < final_lower else -1
+
+    return {
+        'atr': atr,
+        'final_upper': final_upper,
+        'final_lower': final_lower,
+        'trend': final_lower if direction == -1 else final_upper,
+        'direction': direction
+    }
+
+
+def _seed_supertrend_state(high, low, close, period, multiplier):
+    """Replay the recurrence over the full history to get the state after the last bar"""
+    n = len(close)
+    if n < period:
+        return None
+
+    tr_sum = high[0] - low[0]
+    for i in range(1, period):
+        tr_sum += max(high[i] - low[i], abs(high[i] - close[i - 1]), abs(low[i] - close[i - 1]))
+    atr = tr_sum / period
+
+    hl_avg = (high[period - 1] + low[period - 1]) / 2.0
+    upper = hl_avg + multiplier * atr
+    state = {'atr': atr, 'final_upper': upper, 'final_lower': hl_avg - multiplier * atr,
+             'trend': upper, 'direction': 1}
+    for i in range(period, n):
+        state = _supertrend_step(state, high[i], low[i], close[i], close[i - 1], period, multiplier)
+    return state
+
+
+def calculate_supertrend_incremental(key, timestamps, high, low, close, period=7, multiplier=3):
+    """
+    calculate_supertrend with per-series memoization.
+
+    The result for `key` is cached along with the Supertrend state after its last bar:
+    - same last bar as the previous call -> cached result, no recompute
+    - same first bar, exactly one new bar appended -> one O(1) recurrence step on the cached state
+    - anything else (first call, gap, last bar revised, window slid or shrank) -> full recompute
+
+    The ATR seed depends on the first bar, so the step is only taken while the window
+    start is unchanged - the result always equals calculate_supertrend on the same input.
+
+    Args:
+        key: Hashable identity of the price series (e.g. strategy + legs + timeframe)
+        timestamps: Bar timestamps aligned with high/low/close
+        high, low, close, period, multiplier: as for calculate_supertrend
+
+    Returns:
+        Same tuple as calculate_supertrend: (trend, direction, long, short)
+    """
+    period = int(period)
+    multiplier = float(multiplier)
+    high = np.ascontiguousarray(high, dtype=np.float64)
+    low = np.ascontiguousarray(low, dtype=np.float64)
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    n = len(close)
+    if n == 0:
+        return calculate_supertrend(high, low, close, period=period, multiplier=multiplier)
+
+    cache_key = (key, period, multiplier)
+    with _incremental_lock:
+        cached = _incremental_states.get(cache_key)
+
+    if cached:
+        last_bar = (timestamps[-1], high[-1], low[-1], close[-1])
+        if last_bar == cached['last_bar'] and n == len(cached['result'][0]):
+            return cached['result']
+
+        prev_bar = (timestamps[-2], high[-2], low[-2], close[-2]) if n > 1 else None
+        prev_trend, prev_direction = cached['result'][0], cached['result'][1]
+        if (timestamps[0] == cached['first_ts'] and prev_bar == cached['last_bar']
+                and len(prev_trend) == n - 1 and not np.isnan(prev_trend[-1])):
+            state = _supertrend_step(cached['state'], high[-1], low[-1], close[-1], close[-2], period, multiplier)
+            trend = np.append(prev_trend, state['trend'])
+            direction = np.append(prev_direction, np.int32(state['direction']))
+            result = (trend, direction,
+                      np.where(direction == -1, trend, np.nan),
+                      np.where(direction == 1, trend, np.nan))
+            _store_incremental_state(cache_key, timestamps[0], last_bar, state, result)
+            return result
+
+    result = calculate_supertrend(high, low, close, period=period, multiplier=multiplier)
+    state = _seed_supertrend_state(high, low, close, period, multiplier)
+    if state is not None:
+        _store_incremental_state(cache_key, timestamps[0], (timestamps[-1], high[-1], low[-1], close[-1]), state, result)
+    return result
+
+
+def _store_incremental_state(cache_key, first_ts, last_bar, state, result):
+    with _incremental_lock:
+        _incremental_states[cache_key] = {'first_ts': first_ts, 'last_bar': last_bar, 'state': state, 'result': result}
+        _incremental_states.move_to_end(cache_key)
+        while len(_incremental_states) > INCREMENTAL_CACHE_SIZE:
+            _incremental_states.popitem(last=False)
+
+
 def get_supertrend_signal(direction):
     """
     Get current Supertrend signal
@@ -119,18 +235,28 @@ def get_supertrend_signal(direction):
         return 'NEUTRAL'
 
 
+def common_index(frames):
+    """Bars present in every frame (legs normally share one index, so this is a no-op)"""
+    index = frames[0].index
+    for df in frames[1:]:
+        if not df.index.equals(index):
+            index = index.intersection(df.index)
+    return index
+
+
 def calculate_spread_supertrend(leg_prices_dict, high_col='high', low_col='low', close_col='close',
-                                period=7, multiplier=3):
+                                period=7, multiplier=3, return_numpy=False):
     """
     Calculate Supertrend for a combined spread of multiple legs
 
     Args:
-        leg_prices_dict: Dict of {leg_name: DataFrame} with OHLC data
+        leg_prices_dict: Dict of {leg_name: DataFrame} with OHLC data (legs share the same bars)
         high_col: Column name for high price
         low_col: Column name for low price
         close_col: Column name for close price
         period: ATR period
         multiplier: ATR multiplier
+        return_numpy: Return spread high/low/close as numpy arrays instead of pandas Series
 
     Returns:
         Dict with spread OHLC and Supertrend data
@@ -142,48 +268,54 @@ def calculate_spread_supertrend(leg_prices_dict, high_col='high', low_col='low',
             logger.error("No leg prices provided")
             return None
 
-        # Calculate combined spread
-        combined_high = None
-        combined_low = None
-        combined_close = None
-
-        for leg_name, df in leg_prices_dict.items():
-            if combined_close is None:
-                combined_high = df[high_col].copy()
-                combined_low = df[low_col].copy()
-                combined_close = df[close_col].copy()
-            else:
-                combined_high += df[high_col]
-                combined_low += df[low_col]
-                combined_close += df[close_col]
-
-        # Create spread DataFrame
-        spread_df = pd.DataFrame({
-            'high': combined_high,
-            'low': combined_low,
-            'close': combined_close
-        })
+        # Align legs on the bars they all share, then stack into (n_legs, n_bars) and sum in one reduction
+        legs = list(leg_prices_dict.values())
+        index = common_index(legs)
+        if len(index) == 0:
+            logger.error("No common timestamps across legs")
+            return None
+        legs = [df if df.index.equals(index) else df.reindex(index) for df in legs]
+        combined_high = np.stack([df[high_col].to_numpy(dtype=np.float64) for df in legs]).sum(axis=0)
+        combined_low = np.stack([df[low_col].to_numpy(dtype=np.float64) for df in legs]).sum(axis=0)
+        combined_close = np.stack([df[close_col].to_numpy(dtype=np.float64) for df in legs]).sum(axis=0)
 
         # Calculate Supertrend using OpenAlgo
-        spread_df['supertrend'], spread_df['direction'] = ta.supertrend(
-            spread_df['high'], spread_df['low'], spread_df['close'],
-            period=period, multiplier=multiplier
+        supertrend, direction_raw = ta.supertrend(
+            combined_high, combined_low, combined_close,
+            period=int(period), multiplier=float(multiplier)
         )
 
         # Convert direction NaN to 0
-        direction = spread_df['direction'].fillna(0).astype(int).values
+        direction = np.nan_to_num(direction_raw, nan=0.0).astype(int)
+
+        if not return_numpy:
+            combined_high = pd.Series(combined_high, index=index, name=high_col)
+            combined_low = pd.Series(combined_low, index=index, name=low_col)
+            combined_close = pd.Series(combined_close, index=index, name=close_col)
 
         return {
             'high': combined_high,
             'low': combined_low,
             'close': combined_close,
-            'supertrend': spread_df['supertrend'].values,
+            'supertrend': supertrend,
             'direction': direction,
-            'long': np.where(direction == -1, spread_df['supertrend'].values, np.nan),
-            'short': np.where(direction == 1, spread_df['supertrend'].values, np.nan),
+            'long': np.where(direction == -1, supertrend, np.nan),
+            'short': np.where(direction == 1, supertrend, np.nan),
             'signal': get_supertrend_signal(direction)
         }
 
     except Exception as e:
         logger.error(f"Error calculating spread Supertrend: {e}", exc_info=True)
         return None
+
+
+def warmup_supertrend():
+    """Compile the Numba Supertrend kernel up front so the first live tick doesn't pay the JIT cost"""
+    bars = np.linspace(100.0, 110.0, 16)
+    calculate_supertrend(bars + 1.0, bars - 1.0, bars, period=7, multiplier=3.0)
+    logger.debug("Supertrend kernel warmed up")
+
+
+# Opt-in so a preloading server (gunicorn --preload) compiles once before forking workers
+if os.environ.get('ST_WARMUP'):
+    warmup_supertrend()
@@ -3,12 +3,20 @@ Background Service for Supertrend-based Exit Monitoring
 Monitors strategies with Supertrend exit enabled and triggers exits on signal
 """
 
+import concurrent.futures
+from contextlib import nullcontext
 import threading
 import logging
+import os
+import traceback
 from datetime import datetime, time, timedelta
 import time as time_module
 from typing import Dict, Any, List
+from apscheduler.executors.pool import ThreadPoolExecutor as SchedulerThreadPool
 from apscheduler.schedulers.background import BackgroundScheduler
+from flask import current_app, has_app_context
+from sqlalchemy import or_, update as sa_update
+from sqlalchemy.orm import joinedload
 import pytz
 
 # IST timezone for storing timestamps
@@ -18,13 +26,19 @@ def get_ist_now():
     """Get current time in IST (naive datetime for DB storage)"""
     return datetime.now(IST).replace(tzinfo=None)
 
-from app.models import Strategy, StrategyExecution, TradingAccount
-from app.utils.supertrend import calculate_supertrend
+from app.models import (
+    Strategy, StrategyExecution, TradingAccount,
+    SUPERTREND_TIMEFRAME_MINUTES, DEFAULT_SUPERTREND_TIMEFRAME_MINUTES
+)
+from app.utils.supertrend import calculate_supertrend_incremental, common_index, warmup_supertrend
 from app.utils.openalgo_client import ExtendedOpenAlgoAPI
+from app.utils.candle_cache import candle_cache
+from app.utils.freeze_quantity_handler import place_orders_with_freeze_check
 from app.utils.exit_order_manager import (
-    can_attempt_exit, mark_exit_pending, mark_exit_success, mark_exit_failed,
-    mark_exit_confirmed, verify_exit_order_at_broker, get_pending_exit_retries,
-    atomic_claim_exit, atomic_claim_exit_retry,
+    can_attempt_exit, mark_exit_pending, mark_exit_success,
+    mark_exit_confirmed, fetch_broker_snapshot, verify_exit_order_at_broker_cached,
+    get_pending_exit_retries_by_strategy,
+    atomic_claim_exits_bulk, mark_exits_failed_bulk, renew_exit_claims,
     EXIT_RETRY_DELAY_SECONDS, MAX_EXIT_ATTEMPTS
 )
 import pandas as pd
@@ -32,6 +46,32 @@ import numpy as np
 
 logger = logging.getLogger(__name__)
 
+# Signal checks are I/O-bound (history fetch per leg), so due strategies are checked
+# concurrently; the cycle stops waiting after the timeout to stay inside the one-minute
+# cron window, and a check still running then is not resubmitted until it finishes
+MAX_CHECK_WORKERS = 16
+CHECK_CYCLE_TIMEOUT_SECONDS = 50
+
+# Exit order groups (one per account, plus individual retries) placed concurrently per phase
+MAX_EXIT_WORKERS = 8
+
+# A late cycle still runs as long as it starts inside its own minute - the due
+# candle intervals are resolved from the minute it actually runs in
+MONITOR_MISFIRE_GRACE_SECONDS = 45
+
+
+def _app_context(app):
+    """Reuse the caller's app context (and its session); push one only when called without"""
+    return nullcontext() if has_app_context() else app.app_context()
+
+
+# Filter out executions whose entry the broker rejected/cancelled (NULL = status unknown).
+# Built once: SQL expressions are immutable and can be reused by every query
+_entry_not_rejected = or_(
+    StrategyExecution.broker_order_status.is_(None),
+    StrategyExecution.broker_order_status.notin_(['rejected', 'cancelled'])
+)
+
 
 class SupertrendExitService:
     """
@@ -54,9 +94,33 @@ class SupertrendExitService:
         if self._initialized:
             return
 
-        self.scheduler = BackgroundScheduler(timezone=pytz.timezone('Asia/Kolkata'))
+        # The scheduler pool only runs the monitor cycle and one-off jobs; the
+        # per-strategy checks fan out to _check_executor inside monitor_strategies
+        self.scheduler = BackgroundScheduler(
+            timezone=IST,
+            executors={'default': SchedulerThreadPool(max(4, os.cpu_count() or 1))},
+            job_defaults={
+                'coalesce': True,
+                'max_instances': 1,
+                'misfire_grace_time': MONITOR_MISFIRE_GRACE_SECONDS
+            }
+        )
         self.is_running = False
         self.monitoring_strategies = {}  # strategy_id -> last_check_time
+        self.last_checked_bar = {}  # strategy_id -> signature of the last bar that gave no exit
+        self._api_clients = {}  # (api_key, host) -> ExtendedOpenAlgoAPI, shared by checks and exits
+        # Long-lived pool for exit placement: threads are started once and reused by
+        # every phase of every trigger instead of being spawned per phase
+        self._exit_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_EXIT_WORKERS,
+            thread_name_prefix='supertrend-exit'
+        )
+        # Same for signal checks; only the monitor cycle (max_instances=1) touches _check_futures
+        self._check_executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=MAX_CHECK_WORKERS,
+            thread_name_prefix='supertrend-check'
+        )
+        self._check_futures = {}  # strategy_id -> Future of its last submitted check
         self.flask_app = None  # Store Flask app reference instead of creating new one
         self._initialized = True
 
@@ -67,6 +131,17 @@ class SupertrendExitService:
         self.flask_app = app
         logger.debug("Flask app instance registered with Supertrend Exit Service")
 
+    def _get_client(self, account) -> ExtendedOpenAlgoAPI:
+        """Get a cached API client for the account so HTTP connections are reused"""
+        api_key = account.get_api_key()
+        key = (api_key, account.host_url)
+        client = self._api_clients.get(key)
+        if client is None:
+            client = self._api_clients.setdefault(
+                key, ExtendedOpenAlgoAPI(api_key=api_key, host=account.host_url)
+            )
+        return client
+
     def start_service(self):
         """Start the background service"""
         if not self.is_running:
@@ -90,7 +165,16 @@ class SupertrendExitService:
                 id='supertrend_monitor',
                 replace_existing=True,
                 max_instances=1,
-                coalesce=True  # Skip missed runs if system was busy
+                coalesce=True,  # Skip missed runs if system was busy
+                misfire_grace_time=MONITOR_MISFIRE_GRACE_SECONDS  # Default 1s drops runs that start late
+            )
+
+            # Compile the Numba Supertrend kernel now (one-off job, runs immediately in the
+            # scheduler's pool) so the first candle-close check doesn't pay the JIT cost
+            self.scheduler.add_job(
+                func=warmup_supertrend,
+                id='supertrend_warmup',
+                replace_existing=True
             )
 
             logger.debug("Supertrend Exit Service started - monitoring at start of each minute")
@@ -109,6 +193,9 @@ class SupertrendExitService:
         """
         import uuid
         cycle_id = str(uuid.uuid4())[:8]  # Unique ID for this execution cycle
+        cycle_start = time_module.monotonic()
+        exit_signals = 0
+        retried = 0
 
         try:
             # Use stored Flask app, or create one if not set (fallback)
@@ -121,76 +208,120 @@ class SupertrendExitService:
             with app.app_context():
                 from app import db
 
-                logger.info(f"[SUPERTREND CYCLE {cycle_id}] === Starting monitor_strategies ===")
+                logger.debug(f"[SUPERTREND CYCLE {cycle_id}] === Starting monitor_strategies ===")
 
                 # Track strategies processed in THIS execution cycle to prevent double-processing
                 # This prevents the RETRY loop from re-processing strategies that were just triggered
                 strategies_processed_this_cycle = set()
 
-                # Get all strategies with Supertrend exit enabled and not yet triggered
-                strategies = Strategy.query.filter_by(
+                # One query for every active Supertrend strategy, split by trigger state:
+                # not yet triggered -> signal check, triggered -> retry check below.
+                # (A strategy triggered during the first loop lands in the processed set,
+                # which the retry loop skips, so reading the flag up front is equivalent).
+                # NULL flags match neither list, same as the SQL equality filters they replace
+                enabled_strategies = Strategy.query.filter_by(
                     supertrend_exit_enabled=True,
-                    supertrend_exit_triggered=False,
                     is_active=True
                 ).all()
+                strategies = [s for s in enabled_strategies if s.supertrend_exit_triggered is False]
+                triggered_strategies = [s for s in enabled_strategies if s.supertrend_exit_triggered is True]
 
-                logger.info(f"[SUPERTREND CYCLE {cycle_id}] Found {len(strategies)} non-triggered strategies")
+                logger.debug(f"[SUPERTREND CYCLE {cycle_id}] Found {len(strategies)} non-triggered strategies")
 
-                if strategies:
-                    for strategy in strategies:
-                        try:
-                            # Check if we should monitor this strategy based on timeframe
-                            should_check = self.should_check_strategy(strategy)
-                            logger.info(f"[SUPERTREND CYCLE {cycle_id}] Strategy {strategy.id} ({strategy.name}): should_check={should_check}")
+                # Candle closes depend only on the minute, so resolve them once per cycle
+                due_intervals = self.due_candle_intervals()
 
-                            if should_check:
-                                # Track that we're processing this strategy in this cycle
-                                strategies_processed_this_cycle.add(strategy.id)
-                                logger.info(f"[SUPERTREND CYCLE {cycle_id}] Strategy {strategy.id}: Added to processed set, calling check_supertrend_exit")
-                                self.check_supertrend_exit(strategy, app)
-                                logger.info(f"[SUPERTREND CYCLE {cycle_id}] Strategy {strategy.id}: check_supertrend_exit completed")
-                        except Exception as e:
-                            logger.error(f"Error monitoring strategy {strategy.id}: {e}", exc_info=True)
+                due_strategy_ids = []
+                for strategy in strategies:
+                    try:
+                        # Check if we should monitor this strategy based on timeframe
+                        should_check = self.should_check_strategy(strategy, due_intervals)
+                        logger.debug(f"[SUPERTREND CYCLE {cycle_id}] Strategy {strategy.id} ({strategy.name}): should_check={should_check}")
+
+                        if should_check:
+                            # Track that we're processing this strategy in this cycle
+                            strategies_processed_this_cycle.add(strategy.id)
+                            due_strategy_ids.append(strategy.id)
+                    except Exception as e:
+                        logger.error(f"Error monitoring strategy {strategy.id}: {e}", exc_info=True)
+
+                # Drop finished checks; whatever is left is still running from an earlier cycle
+                self._check_futures = {
+                    strategy_id: future for strategy_id, future in self._check_futures.items()
+                    if not future.done()
+                }
+
+                if due_strategy_ids:
+                    # Each worker loads its strategy in its own app context/session - ORM objects
+                    # from this thread's session must not be shared across threads
+                    futures = {}
+                    for strategy_id in due_strategy_ids:
+                        if strategy_id in self._check_futures:
+                            logger.warning(f"[SUPERTREND CYCLE {cycle_id}] Strategy {strategy_id}: previous check still running, skipping")
+                            continue
+                        future = self._check_executor.submit(self._check_strategy_by_id, strategy_id, app)
+                        self._check_futures[strategy_id] = future
+                        futures[future] = strategy_id
+
+                    done, not_done = concurrent.futures.wait(futures, timeout=CHECK_CYCLE_TIMEOUT_SECONDS)
+                    exit_signals = sum(1 for future in done if future.result())
+                    for future in not_done:
+                        logger.warning(f"[SUPERTREND CYCLE {cycle_id}] Strategy {futures[future]}: check still running after "
+                                      f"{CHECK_CYCLE_TIMEOUT_SECONDS}s, continuing cycle")
+                    logger.debug(f"[SUPERTREND CYCLE {cycle_id}] Checked {len(done)}/{len(due_strategy_ids)} due strategies")
 
-                logger.info(f"[SUPERTREND CYCLE {cycle_id}] Processed set after first loop: {strategies_processed_this_cycle}")
+                logger.debug(f"[SUPERTREND CYCLE {cycle_id}] Processed set after first loop: {strategies_processed_this_cycle}")
 
                 # RETRY MECHANISM: Check strategies where Supertrend was triggered but positions still pending
                 # Uses exit_order_manager to check for positions ready for retry
-                triggered_strategies = Strategy.query.filter_by(
-                    supertrend_exit_enabled=True,
-                    supertrend_exit_triggered=True,
-                    is_active=True
-                ).all()
-
-                logger.info(f"[SUPERTREND CYCLE {cycle_id}] Found {len(triggered_strategies)} triggered strategies for RETRY check")
+                logger.debug(f"[SUPERTREND CYCLE {cycle_id}] Found {len(triggered_strategies)} triggered strategies for RETRY check")
+
+                # One timestamp and one query for every retry-window check in this cycle
+                # (only the window - each exit takes its own time for the claim lease)
+                retry_now = datetime.utcnow()
+                retries_by_strategy = get_pending_exit_retries_by_strategy(
+                    [s.id for s in triggered_strategies if s.id not in strategies_processed_this_cycle],
+                    now=retry_now
+                )
 
                 for strategy in triggered_strategies:
                     try:
                         # CRITICAL: Skip if this strategy was just processed in the first loop
                         # This prevents double-trigger within the same execution cycle
                         if strategy.id in strategies_processed_this_cycle:
-                            logger.info(f"[SUPERTREND CYCLE {cycle_id}] RETRY Strategy {strategy.id}: SKIPPING - in processed set")
+                            logger.debug(f"[SUPERTREND CYCLE {cycle_id}] RETRY Strategy {strategy.id}: SKIPPING - in processed set")
                             continue
 
                         # Get positions ready for exit retry (exit_pending with expired retry timer)
-                        pending_retries = get_pending_exit_retries(strategy.id)
+                        pending_retries = retries_by_strategy.get(strategy.id, [])
 
-                        logger.info(f"[SUPERTREND CYCLE {cycle_id}] RETRY Strategy {strategy.id}: {len(pending_retries)} positions ready for retry")
+                        logger.debug(f"[SUPERTREND CYCLE {cycle_id}] RETRY Strategy {strategy.id}: {len(pending_retries)} positions ready for retry")
 
                         if pending_retries:
-                            for pos in pending_retries:
-                                logger.info(f"[SUPERTREND CYCLE {cycle_id}] RETRY Strategy {strategy.id}: Position {pos.id} - {pos.symbol}, status={pos.status}, attempt={pos.exit_attempt_count}")
+                            if logger.isEnabledFor(logging.DEBUG):
+                                for pos in pending_retries:
+                                    logger.debug(f"[SUPERTREND CYCLE {cycle_id}] RETRY Strategy {strategy.id}: Position {pos.id} - {pos.symbol}, status={pos.status}, attempt={pos.exit_attempt_count}")
                             logger.info(f"[SUPERTREND CYCLE {cycle_id}] RETRY Strategy {strategy.id}: Calling trigger_sequential_exit")
                             self.trigger_sequential_exit(strategy, f"Supertrend RETRY - {len(pending_retries)} positions pending", app)
+                            retried += 1
                     except Exception as e:
                         logger.error(f"Error retrying Supertrend exit for strategy {strategy.id}: {e}", exc_info=True)
 
-                logger.info(f"[SUPERTREND CYCLE {cycle_id}] === Completed monitor_strategies ===")
+                # One INFO line per cycle; per-strategy detail is at DEBUG
+                logger.info(f"[SUPERTREND CYCLE {cycle_id}] strategies={len(strategies)} due={len(due_strategy_ids)} "
+                            f"exit_signals={exit_signals} triggered={len(triggered_strategies)} retried={retried} "
+                            f"duration_ms={(time_module.monotonic() - cycle_start) * 1000:.0f}")
 
         except Exception as e:
             logger.error(f"Error in monitor_strategies: {e}", exc_info=True)
 
-    def should_check_strategy(self, strategy: Strategy) -> bool:
+    def due_candle_intervals(self, now: datetime = None) -> set:
+        """Candle lengths (minutes) that close at this minute"""
+        minute = (now or datetime.now(IST)).minute
+        intervals = set(SUPERTREND_TIMEFRAME_MINUTES.values()) | {DEFAULT_SUPERTREND_TIMEFRAME_MINUTES}
+        return {m for m in intervals if minute % m == 0}
+
+    def should_check_strategy(self, strategy: Strategy, due_intervals: set = None) -> bool:
         """
         Determine if this is a candle close time for the strategy's timeframe.
         Called at :00 seconds of each minute via cron trigger.
@@ -199,69 +330,74 @@ class SupertrendExitService:
         For 5m: checks at :00, :05, :10, :15, :20, :25, :30, :35, :40, :45, :50, :55
         For 10m: checks at :00, :10, :20, :30, :40, :50
         For 15m: checks at :00, :15, :30, :45
+
+        due_intervals: Optional result of due_candle_intervals() shared across a cycle
         """
-        now = datetime.now(pytz.timezone('Asia/Kolkata'))
-        current_minute = now.minute
+        if due_intervals is None:
+            due_intervals = self.due_candle_intervals()
 
-        # Map timeframe to minutes
-        timeframe_minutes = {
-            '3m': 3,
-            '5m': 5,
-            '10m': 10,
-            '15m': 15
-        }
+        # Check if current minute aligns with the timeframe (candle close)
+        return strategy.supertrend_timeframe_minutes in due_intervals
 
-        interval_minutes = timeframe_minutes.get(strategy.supertrend_timeframe, 5)
+    def _check_strategy_by_id(self, strategy_id: int, app):
+        """Worker entry point: load the strategy in this thread's app context and check it (True = exit signal)"""
+        try:
+            with app.app_context():
+                from app import db
 
-        # Check if current minute aligns with the timeframe (candle close)
-        return (current_minute % interval_minutes) == 0
+                strategy = db.session.get(Strategy, strategy_id)
+                if strategy:
+                    return self.check_supertrend_exit(strategy, app)
+        except Exception as e:
+            logger.error(f"Error monitoring strategy {strategy_id}: {e}", exc_info=True)
+        return False
 
     def check_supertrend_exit(self, strategy: Strategy, app):
         """
         Check if Supertrend exit condition is met for a strategy
+
+        Returns True if an exit signal was found and the exit triggered
         """
-        with app.app_context():
+        with _app_context(app):
             from app import db
 
             try:
-                logger.info(f"[CHECK_EXIT] Strategy {strategy.id}: Starting check_supertrend_exit")
-                logger.info(f"[CHECK_EXIT] Strategy {strategy.id}: Config - timeframe={strategy.supertrend_timeframe}, period={strategy.supertrend_period}, multiplier={strategy.supertrend_multiplier}, exit_type={strategy.supertrend_exit_type}")
+                logger.debug(f"[CHECK_EXIT] Strategy {strategy.id}: Starting check_supertrend_exit")
+                logger.debug(f"[CHECK_EXIT] Strategy {strategy.id}: Config - timeframe={strategy.supertrend_timeframe}, period={strategy.supertrend_period}, multiplier={strategy.supertrend_multiplier}, exit_type={strategy.supertrend_exit_type}")
 
-                # Update last check time
-                self.monitoring_strategies[strategy.id] = datetime.now(pytz.timezone('Asia/Kolkata'))
+                # Update last check time (checks run on worker threads)
+                with self._lock:
+                    self.monitoring_strategies[strategy.id] = datetime.now(IST)
 
                 # Check if strategy has open positions
-                open_positions = StrategyExecution.query.filter_by(
+                # Legs ride along so the spread fetch needs no further queries
+                open_positions = StrategyExecution.query.options(
+                    joinedload(StrategyExecution.leg)
+                ).filter_by(
                     strategy_id=strategy.id,
                     status='entered'
+                ).filter(
+                    _entry_not_rejected
                 ).all()
 
-                logger.info(f"[CHECK_EXIT] Strategy {strategy.id}: Found {len(open_positions)} positions with status='entered'")
-
-                # Filter out rejected/cancelled
-                open_positions = [
-                    pos for pos in open_positions
-                    if not (hasattr(pos, 'broker_order_status') and
-                           pos.broker_order_status in ['rejected', 'cancelled'])
-                ]
-
-                logger.info(f"[CHECK_EXIT] Strategy {strategy.id}: After filtering rejected/cancelled: {len(open_positions)} positions")
+                logger.debug(f"[CHECK_EXIT] Strategy {strategy.id}: Found {len(open_positions)} positions with status='entered' (excluding rejected/cancelled)")
 
                 if not open_positions:
-                    logger.info(f"[CHECK_EXIT] Strategy {strategy.id}: NO OPEN POSITIONS - skipping exit check")
+                    logger.debug(f"[CHECK_EXIT] Strategy {strategy.id}: NO OPEN POSITIONS - skipping exit check")
                     return
 
-                for pos in open_positions:
-                    logger.info(f"[CHECK_EXIT] Strategy {strategy.id}: Position {pos.id} - {pos.symbol}, leg_id={pos.leg_id}, qty={pos.quantity}, broker_status={getattr(pos, 'broker_order_status', 'N/A')}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    for pos in open_positions:
+                        logger.debug(f"[CHECK_EXIT] Strategy {strategy.id}: Position {pos.id} - {pos.symbol}, leg_id={pos.leg_id}, qty={pos.quantity}, broker_status={pos.broker_order_status}")
 
                 # Get set of leg IDs that have open positions
                 # A leg is considered "open" if ANY account has an open position for it
                 open_leg_ids = set(pos.leg_id for pos in open_positions if pos.leg_id)
-                logger.info(f"[CHECK_EXIT] Strategy {strategy.id}: {len(open_positions)} open positions across {len(open_leg_ids)} legs (leg_ids: {open_leg_ids})")
+                logger.debug(f"[CHECK_EXIT] Strategy {strategy.id}: {len(open_positions)} open positions across {len(open_leg_ids)} legs (leg_ids: {open_leg_ids})")
 
                 # Fetch combined spread data ONLY for legs with open positions
                 # This ensures closed legs don't affect the Supertrend calculation
-                spread_data = self.fetch_combined_spread_data(strategy, open_leg_ids=open_leg_ids)
+                spread_data = self.fetch_combined_spread_data(strategy, open_positions=open_positions)
 
                 if spread_data is None:
                     logger.warning(f"[CHECK_EXIT] Strategy {strategy.id}: spread_data is None - cannot calculate Supertrend")
@@ -271,7 +407,7 @@ class SupertrendExitService:
                     logger.warning(f"[CHECK_EXIT] Strategy {strategy.id}: Insufficient data - got {len(spread_data)} bars, need {strategy.supertrend_period + 5}")
                     return
 
-                logger.info(f"[CHECK_EXIT] Strategy {strategy.id}: Got {len(spread_data)} bars of spread data")
+                logger.debug(f"[CHECK_EXIT] Strategy {strategy.id}: Got {len(spread_data)} bars of spread data")
 
                 # Calculate Supertrend on spread OHLC
                 # NOTE: Direction is calculated based on CLOSE price only (not high/low)
@@ -279,8 +415,23 @@ class SupertrendExitService:
                 low = spread_data['low'].values
                 close = spread_data['close'].values
 
-                trend, direction, long, short = calculate_supertrend(
-                    high, low, close,
+                # Memoized per strategy/open legs/timeframe: a single new candle since the
+                # last check is one recurrence step instead of a recompute over all bars
+                series_key = (strategy.id, tuple(sorted(open_leg_ids)), strategy.supertrend_timeframe)
+
+                # Same last bar and settings as a check that gave no exit -> same answer.
+                # Happens when the broker has not published the new candle yet at the close
+                bar_signature = (series_key, spread_data.index[-1], high[-1], low[-1], close[-1],
+                                 strategy.supertrend_period, strategy.supertrend_multiplier,
+                                 strategy.supertrend_exit_type)
+                with self._lock:
+                    unchanged = self.last_checked_bar.get(strategy.id) == bar_signature
+                if unchanged:
+                    logger.debug(f"[CHECK_EXIT] Strategy {strategy.id}: No new candle since last check ({spread_data.index[-1]}) - skipping")
+                    return
+
+                trend, direction, long, short = calculate_supertrend_incremental(
+                    series_key, spread_data.index, high, low, close,
                     period=strategy.supertrend_period,
                     multiplier=strategy.supertrend_multiplier
                 )
@@ -290,8 +441,8 @@ class SupertrendExitService:
                 latest_supertrend = trend[-1]
                 latest_direction = direction[-1]  # Direction based on CLOSE crossing Supertrend
 
-                logger.info(f"[CHECK_EXIT] Strategy {strategy.id}: Supertrend values - close={latest_close:.2f}, ST={latest_supertrend:.2f}, direction={latest_direction} ({('BULLISH/UP' if latest_direction == -1 else 'BEARISH/DOWN')})")
-                logger.info(f"[CHECK_EXIT] Strategy {strategy.id}: Exit type={strategy.supertrend_exit_type}, Looking for direction={-1 if strategy.supertrend_exit_type == 'breakout' else 1}")
+                logger.debug(f"[CHECK_EXIT] Strategy {strategy.id}: Supertrend values - close={latest_close:.2f}, ST={latest_supertrend:.2f}, direction={latest_direction} ({('BULLISH/UP' if latest_direction == -1 else 'BEARISH/DOWN')})")
+                logger.debug(f"[CHECK_EXIT] Strategy {strategy.id}: Exit type={strategy.supertrend_exit_type}, Looking for direction={-1 if strategy.supertrend_exit_type == 'breakout' else 1}")
 
                 # Check for exit signal based ONLY on close price vs Supertrend
                 # Exit triggers on candle close, executes immediately
@@ -322,13 +473,18 @@ class SupertrendExitService:
                 if should_exit:
                     logger.info(f"[CHECK_EXIT] Strategy {strategy.id}: EXIT SIGNAL DETECTED - calling trigger_sequential_exit")
                     self.trigger_sequential_exit(strategy, exit_reason, app)
+                    return True
                 else:
-                    logger.info(f"[CHECK_EXIT] Strategy {strategy.id}: NO EXIT SIGNAL - direction={latest_direction}, exit_type={strategy.supertrend_exit_type}, needed={-1 if strategy.supertrend_exit_type == 'breakout' else 1}")
+                    with self._lock:
+                        self.last_checked_bar[strategy.id] = bar_signature
+                    logger.debug(f"[CHECK_EXIT] Strategy {strategy.id}: NO EXIT SIGNAL - direction={latest_direction}, exit_type={strategy.supertrend_exit_type}, needed={-1 if strategy.supertrend_exit_type == 'breakout' else 1}")
 
             except Exception as e:
                 logger.error(f"Error checking Supertrend exit for strategy {strategy.id}: {e}", exc_info=True)
+                db.session.rollback()
 
-    def fetch_combined_spread_data(self, strategy: Strategy, open_leg_ids: set = None) -> pd.DataFrame:
+    def fetch_combined_spread_data(self, strategy: Strategy, open_leg_ids: set = None,
+                                   open_positions: list = None) -> pd.DataFrame:
         """
         Fetch real-time combined spread data for strategy legs
         Similar to tradingview routes but optimized for exit monitoring
@@ -338,12 +494,20 @@ class SupertrendExitService:
             open_leg_ids: Optional set of leg IDs that have open positions.
                          If provided, only these legs will be included in the spread calculation.
                          This ensures closed legs don't affect the Supertrend calculation.
+            open_positions: Optional open executions (with legs loaded). When given, legs,
+                            open leg IDs and placed symbols are all derived from them
+                            instead of being queried again.
         """
         try:
             from app.models import StrategyLeg, StrategyExecution
 
-            # Get strategy legs
-            legs = StrategyLeg.query.filter_by(strategy_id=strategy.id).all()
+            if open_positions is not None:
+                legs_by_id = {pos.leg_id: pos.leg for pos in open_positions if pos.leg_id and pos.leg}
+                legs = [legs_by_id[leg_id] for leg_id in sorted(legs_by_id)]
+                open_leg_ids = set(legs_by_id)
+            else:
+                # Get strategy legs
+                legs = StrategyLeg.query.filter_by(strategy_id=strategy.id).all()
 
             if not legs:
                 logger.error(f"Strategy {strategy.id} has no legs")
@@ -384,15 +548,14 @@ class SupertrendExitService:
                 logger.error(f"No active trading account for strategy {strategy.id}")
                 return None
 
-            # Initialize OpenAlgo client
-            client = ExtendedOpenAlgoAPI(
-                api_key=account.get_api_key(),
-                host=account.host_url
-            )
+            # Reuse the account's OpenAlgo client (keeps connections alive across checks)
+            client = self._get_client(account)
 
             # Get actual placed symbols from OPEN executions only
             # This ensures we use symbols from positions that are still active
-            if open_leg_ids is not None:
+            if open_positions is not None:
+                executions = [pos for pos in open_positions if pos.symbol and pos.leg_id in open_leg_ids]
+            elif open_leg_ids is not None:
                 # Filter to only open positions for the relevant legs
                 executions = StrategyExecution.query.filter_by(
                     strategy_id=strategy.id,
@@ -438,13 +601,16 @@ class SupertrendExitService:
                         symbol = leg.instrument
                         exchange = 'NSE'
 
-                    # Fetch historical data
-                    response = client.history(
-                        symbol=symbol,
-                        exchange=exchange,
-                        interval=strategy.supertrend_timeframe,
-                        start_date=start_date_str,
-                        end_date=end_date_str
+                    # Fetch historical data (shared with other strategies in this candle window)
+                    response = candle_cache.get_or_fetch(
+                        symbol, exchange, strategy.supertrend_timeframe, start_date_str, end_date_str,
+                        lambda: client.history(
+                            symbol=symbol,
+                            exchange=exchange,
+                            interval=strategy.supertrend_timeframe,
+                            start_date=start_date_str,
+                            end_date=end_date_str
+                        )
                     )
 
                     if isinstance(response, pd.DataFrame) and not response.empty:
@@ -462,12 +628,15 @@ class SupertrendExitService:
                     elif isinstance(response, dict):
                         # Try fallback to base instrument
                         logger.warning(f"Option symbol {symbol} failed, trying {leg.instrument}")
-                        fallback_response = client.history(
-                            symbol=leg.instrument,
-                            exchange='NSE',
-                            interval=strategy.supertrend_timeframe,
-                            start_date=start_date_str,
-                            end_date=end_date_str
+                        fallback_response = candle_cache.get_or_fetch(
+                            leg.instrument, 'NSE', strategy.supertrend_timeframe, start_date_str, end_date_str,
+                            lambda: client.history(
+                                symbol=leg.instrument,
+                                exchange='NSE',
+                                interval=strategy.supertrend_timeframe,
+                                start_date=start_date_str,
+                                end_date=end_date_str
+                            )
                         )
                         if isinstance(fallback_response, pd.DataFrame) and not fallback_response.empty:
                             lots = leg.lots or 1
@@ -487,77 +656,41 @@ class SupertrendExitService:
                 return None
 
             # Combine OHLC data into spread using CORRECT formula: SELL - BUY with lot sizes
-            sell_dfs = []
-            buy_dfs = []
-
+            sell_legs = []
+            buy_legs = []
             for leg_name, leg_info in leg_data_dict.items():
-                df = leg_info['data']
-                action = leg_info['action']
                 lots = leg_info['lots']
-
-                # Multiply OHLC by lot size
-                weighted_df = df[['open', 'high', 'low', 'close']].copy()
-                weighted_df['open'] = weighted_df['open'] * lots
-                weighted_df['high'] = weighted_df['high'] * lots
-                weighted_df['low'] = weighted_df['low'] * lots
-                weighted_df['close'] = weighted_df['close'] * lots
-
-                if action == 'SELL':
-                    sell_dfs.append(weighted_df)
+                if leg_info['action'] == 'SELL':
+                    sell_legs.append((leg_info['data'], lots))
                     logger.debug(f"  SELL leg {leg_info['leg_number']} x {lots} lots")
                 else:  # BUY
-                    buy_dfs.append(weighted_df)
+                    buy_legs.append((leg_info['data'], lots))
                     logger.debug(f"  BUY leg {leg_info['leg_number']} x {lots} lots")
 
-            # Sum SELL legs
-            sell_total = None
-            if sell_dfs:
-                sell_total = sell_dfs[0].copy()
-                for df in sell_dfs[1:]:
-                    sell_total['open'] = sell_total['open'].add(df['open'], fill_value=0)
-                    sell_total['high'] = sell_total['high'].add(df['high'], fill_value=0)
-                    sell_total['low'] = sell_total['low'].add(df['low'], fill_value=0)
-                    sell_total['close'] = sell_total['close'].add(df['close'], fill_value=0)
-
-            # Sum BUY legs
-            buy_total = None
-            if buy_dfs:
-                buy_total = buy_dfs[0].copy()
-                for df in buy_dfs[1:]:
-                    buy_total['open'] = buy_total['open'].add(df['open'], fill_value=0)
-                    buy_total['high'] = buy_total['high'].add(df['high'], fill_value=0)
-                    buy_total['low'] = buy_total['low'].add(df['low'], fill_value=0)
-                    buy_total['close'] = buy_total['close'].add(df['close'], fill_value=0)
+            # Align every leg on the bars they all have, then sum with plain addition
+            index = common_index([leg_info['data'] for leg_info in leg_data_dict.values()])
+            if len(index) == 0:
+                logger.error(f"No common timestamps across legs for strategy {strategy.id}")
+                return None
+
+            sell_ohlc = _sum_weighted_ohlc(sell_legs, index)
+            buy_ohlc = _sum_weighted_ohlc(buy_legs, index)
 
             # Calculate spread = SELL - BUY, then take absolute value
             # Spread values should always be positive
-            if sell_total is not None and buy_total is not None:
-                combined_df = sell_total.copy()
-                combined_df['open'] = sell_total['open'] - buy_total['open']
-                combined_df['high'] = sell_total['high'] - buy_total['high']
-                combined_df['low'] = sell_total['low'] - buy_total['low']
-                combined_df['close'] = sell_total['close'] - buy_total['close']
-
-                # Take absolute value of all OHLC - spread cannot be negative
-                combined_df['open'] = combined_df['open'].abs()
-                combined_df['high'] = combined_df['high'].abs()
-                combined_df['low'] = combined_df['low'].abs()
-                combined_df['close'] = combined_df['close'].abs()
+            if sell_ohlc is not None and buy_ohlc is not None:
+                spread = np.abs(sell_ohlc - buy_ohlc)
 
                 # Ensure high >= low (swap if needed after abs())
-                high_vals = combined_df['high'].copy()
-                low_vals = combined_df['low'].copy()
-                combined_df['high'] = pd.concat([high_vals, low_vals], axis=1).max(axis=1)
-                combined_df['low'] = pd.concat([high_vals, low_vals], axis=1).min(axis=1)
+                high_vals = spread[:, 1]
+                low_vals = spread[:, 2]
+                spread[:, 1], spread[:, 2] = np.fmax(high_vals, low_vals), np.fmin(high_vals, low_vals)
 
+                combined_df = pd.DataFrame(spread, index=index, columns=OHLC_COLUMNS)
                 logger.debug(f"  Spread calculated with absolute values (always positive)")
-            elif sell_total is not None:
-                combined_df = sell_total
-            elif buy_total is not None:
-                combined_df = buy_total
             else:
-                logger.error(f"No valid leg data for strategy {strategy.id}")
-                return None
+                ohlc = sell_ohlc if sell_ohlc is not None else buy_ohlc
+                combined_df = pd.DataFrame(ohlc, index=index, columns=OHLC_COLUMNS)
 
             logger.debug(f"Combined spread data: {len(combined_df)} bars for strategy {strategy.id}")
             return combined_df
@@ -566,6 +699,23 @@ class SupertrendExitService:
             logger.error(f"Error fetching combined spread data: {e}", exc_info=True)
             return None
 
+    def _place_exit_group(self, app, user_id: int, strategy_name: str, group: list) -> list:
+        """
+        Place one group of queued exits (same account) and return a response per exit.
+
+        Runs on exit worker threads: uses only plain values from the queue, never ORM
+        objects, and pushes its own app context for the freeze-limit lookup.
+        """
+        try:
+            with _app_context(app):
+                return place_orders_with_freeze_check(
+                    group[0]['client'], user_id, strategy_name,
+                    [queued['order'] for queued in group]
+                )
+        except Exception as api_error:
+            logger.warning(f"[SUPERTREND EXIT] API error on {group[0]['account_name']}: {api_error}")
+            return [{'status': 'error', 'message': f'API error: {api_error}'}] * len(group)
+
     def trigger_sequential_exit(self, strategy: Strategy, exit_reason: str, app):
         """
         Trigger sequential exit for all open positions in the strategy.
@@ -576,134 +726,169 @@ class SupertrendExitService:
         Uses sequential processing (like traditional exit) to avoid race conditions
         that can occur with parallel/threaded execution.
         """
-        from app.utils.openalgo_client import ExtendedOpenAlgoAPI
         from app.utils.order_status_poller import order_status_poller
-        import traceback
 
         strategy_id = strategy.id  # Save ID before context switch
-        call_stack = ''.join(traceback.format_stack()[-5:-1])  # Get caller info
+        # One UTC timestamp for the exit times recorded below (the claim lease takes
+        # its own, so a slow trigger does not start with an already expired lease)
+        now = datetime.utcnow()
 
         logger.info(f"[SUPERTREND EXIT] >>> trigger_sequential_exit CALLED for strategy {strategy_id}, reason: {exit_reason}")
-        logger.info(f"[SUPERTREND EXIT] Call stack:\n{call_stack}")
+        if logger.isEnabledFor(logging.DEBUG):
+            # Stack walk is only worth paying for when debugging duplicate triggers
+            call_stack = ''.join(traceback.format_stack()[-5:-1])  # Get caller info
+            logger.debug(f"[SUPERTREND EXIT] Call stack:\n{call_stack}")
 
         try:
-            with app.app_context():
+            with _app_context(app):
                 from app import db
 
-                # ATOMIC CHECK-AND-SET: Re-fetch strategy with row lock to prevent race conditions
-                # This ensures only ONE call can proceed for a given strategy
-                logger.info(f"[SUPERTREND EXIT] Strategy {strategy_id}: Acquiring row lock...")
-                strategy = Strategy.query.with_for_update(nowait=False).get(strategy_id)
-                if not strategy:
-                    logger.error(f"[SUPERTREND EXIT] Strategy {strategy_id} not found")
-                    return
-
-                logger.info(f"[SUPERTREND EXIT] Strategy {strategy_id}: Lock acquired. triggered={strategy.supertrend_exit_triggered}, triggered_at={strategy.supertrend_exit_triggered_at}")
+                # ATOMIC CHECK-AND-SET: a single conditional UPDATE claims the trigger.
+                # Only ONE call can flip the flag. NULL counts as not triggered.
+                trigger_stmt = (
+                    sa_update(Strategy)
+                    .where(Strategy.id == strategy_id)
+                    .where(Strategy.supertrend_exit_triggered.is_not(True))
+                    .values(
+                        supertrend_exit_triggered=True,
+                        supertrend_exit_reason=exit_reason,
+                        supertrend_exit_triggered_at=get_ist_now()
+                    )
+                )
+                if db.session.get_bind().dialect.update_returning:
+                    claimed = bool(db.session.execute(trigger_stmt.returning(Strategy.id)).fetchall())
+                else:
+                    # SQLite < 3.35 has no RETURNING - the rowcount tells the same thing
+                    claimed = db.session.execute(trigger_stmt).rowcount > 0
 
-                # CHECK if already triggered - if yes, skip (another call already handling it)
-                if strategy.supertrend_exit_triggered:
-                    logger.info(f"[SUPERTREND EXIT] Strategy {strategy_id}: ALREADY TRIGGERED - skipping duplicate exit")
-                    db.session.rollback()  # Release the lock
+                if not claimed:
+                    db.session.rollback()
+                    logger.info(f"[SUPERTREND EXIT] Strategy {strategy_id}: ALREADY TRIGGERED (or not found) - skipping duplicate exit")
                     return
 
-                logger.info(f"[SUPERTREND EXIT] Strategy {strategy_id}: NOT triggered yet, proceeding with exit")
+                # Commit the trigger on its own: a rollback in the execution claims below
+                # must not silently undo it
+                db.session.commit()
 
-                # Mark strategy as triggered IMMEDIATELY and commit to release lock
-                # This prevents any other concurrent calls from proceeding
-                strategy.supertrend_exit_triggered = True
-                strategy.supertrend_exit_reason = exit_reason
-                strategy.supertrend_exit_triggered_at = get_ist_now()
-                db.session.commit()  # Commit and release lock - other calls will now see triggered=True
+                logger.info(f"[SUPERTREND EXIT] Strategy {strategy_id}: Trigger claimed, proceeding with exit")
+                strategy = db.session.get(Strategy, strategy_id)
 
                 # Get executions to close based on trigger type:
                 # - For FIRST TRIGGER: status='entered'
                 # - For RETRY events (contains 'RETRY'): status='entered' OR 'exit_pending' (without exit_order_id)
                 is_retry_event = 'RETRY' in exit_reason.upper()
 
+                # Leg (BUY-first ordering) and account (client, logging) come back in the
+                # same JOIN rather than one lazy SELECT per execution
+                executions_query = StrategyExecution.query.options(
+                    joinedload(StrategyExecution.leg),
+                    joinedload(StrategyExecution.account)
+                )
+
                 if is_retry_event:
                     # Retry: Include both 'entered' and 'exit_pending' without exit_order_id
-                    from sqlalchemy import or_
-                    open_executions = StrategyExecution.query.filter(
+                    open_executions = executions_query.filter(
                         StrategyExecution.strategy_id == strategy.id,
                         or_(
                             StrategyExecution.status == 'entered',
                             StrategyExecution.status == 'exit_pending'
                         ),
-                        StrategyExecution.exit_order_id.is_(None)
+                        StrategyExecution.exit_order_id.is_(None),
+                        _entry_not_rejected
                     ).all()
                     logger.info(f"[SUPERTREND EXIT] Retry event: querying for 'entered' OR 'exit_pending' executions")
                 else:
                     # First trigger: Only 'entered' positions
-                    open_executions = StrategyExecution.query.filter_by(
+                    open_executions = executions_query.filter_by(
                         strategy_id=strategy.id,
                         status='entered'
                     ).filter(
-                        StrategyExecution.exit_order_id.is_(None)
+                        StrategyExecution.exit_order_id.is_(None),
+                        _entry_not_rejected
                     ).all()
 
-                # Filter out rejected/cancelled
-                open_executions = [
-                    ex for ex in open_executions
-                    if not (hasattr(ex, 'broker_order_status') and
-                           ex.broker_order_status in ['rejected', 'cancelled'])
-                ]
-
                 if not open_executions:
                     logger.warning(f"[SUPERTREND EXIT] No open positions to close for strategy {strategy.id}")
                     return
 
                 logger.info(f"[SUPERTREND EXIT] Strategy {strategy.id}: Found {len(open_executions)} positions to close")
-                for ex in open_executions:
-                    logger.info(f"[SUPERTREND EXIT] Strategy {strategy.id}: Execution {ex.id} - {ex.symbol}, qty={ex.quantity}, status={ex.status}, exit_order_id={ex.exit_order_id}")
+                if logger.isEnabledFor(logging.DEBUG):
+                    for ex in open_executions:
+                        logger.debug(f"[SUPERTREND EXIT] Strategy {strategy.id}: Execution {ex.id} - {ex.symbol}, qty={ex.quantity}, status={ex.status}, exit_order_id={ex.exit_order_id}")
 
-                # Cache clients per account to avoid creating multiple instances
-                account_clients = {}
                 success_count = 0
 
                 # BUY-FIRST EXIT PRIORITY: Close SELL positions first (BUY orders), then BUY positions (SELL orders)
-                sell_positions = [ex for ex in open_executions if ex.leg and ex.leg.action == 'SELL']
-                buy_positions = [ex for ex in open_executions if ex.leg and ex.leg.action == 'BUY']
-                unknown_positions = [ex for ex in open_executions if not ex.leg]
+                # One pass over the executions (rejected/cancelled entries are already
+                # excluded by the query)
+                sell_positions, buy_positions, unknown_positions = [], [], []
+                for ex in open_executions:
+                    leg = ex.leg
+                    if not leg:
+                        unknown_positions.append(ex)
+                    elif leg.action == 'SELL':
+                        sell_positions.append(ex)
+                    elif leg.action == 'BUY':
+                        buy_positions.append(ex)
 
                 # Reorder: SELL positions first (will place BUY close orders), then BUY positions
                 ordered_executions = sell_positions + buy_positions + unknown_positions
 
                 logger.info(f"[SUPERTREND EXIT] BUY-FIRST priority: {len(sell_positions)} SELL positions (close first), "
                            f"{len(buy_positions)} BUY positions (close second)")
-                print(f"[SUPERTREND EXIT] BUY-FIRST priority: {len(sell_positions)} SELL positions (close first), "
-                      f"{len(buy_positions)} BUY positions (close second)")
+                if current_app.debug:
+                    print(f"[SUPERTREND EXIT] BUY-FIRST priority: {len(sell_positions)} SELL positions (close first), "
+                          f"{len(buy_positions)} BUY positions (close second)")
 
                 # Get execution IDs to process (we'll re-query each one with lock)
                 execution_ids = [ex.id for ex in ordered_executions]
                 sell_count = len(sell_positions)
-                logger.info(f"[SUPERTREND EXIT] Strategy {strategy.id}: Processing execution IDs (ordered): {execution_ids}")
+                logger.debug(f"[SUPERTREND EXIT] Strategy {strategy.id}: Processing execution IDs (ordered): {execution_ids}")
+
+                # ATOMIC DUPLICATE PREVENTION: Claim every execution in one SQL UPDATE.
+                # Only ONE thread/service can claim a row - all others miss it and skip.
+                # This replaces the old can_attempt_exit() + mark_exit_pending() two-step
+                # which had a TOCTOU race on SQLite (with_for_update is a no-op on SQLite).
+                claimed_ids = atomic_claim_exits_bulk(execution_ids, exit_reason, retry=is_retry_event)
+
+                # Reload the claimed rows (the claim's commit expired them) in one query,
+                # with leg and account, instead of one SELECT per execution below.
+                # populate_existing refreshes the instances already in the identity map
+                # from the pre-claim read, so both reads share the same objects.
+                claimed_executions = {
+                    ex.id: ex for ex in executions_query.filter(
+                        StrategyExecution.id.in_(claimed_ids)
+                    ).execution_options(populate_existing=True).all()
+                } if claimed_ids else {}
+
+                queued_exits = []  # exits ready to place, in execution_ids order
+
+                # Retried exits are verified with the broker first. Fetch the books once per
+                # account here so each retry below is a lookup, not two or three HTTP calls
+                broker_snapshots = {}  # account id -> fetch_broker_snapshot() result
+                retry_executions = [
+                    execution for execution in claimed_executions.values()
+                    if (execution.exit_attempt_count or 0) > 1
+                ]
+                if not retry_executions:
+                    logger.debug(f"[SUPERTREND EXIT] Strategy {strategy.id}: no retried exits - skipping broker verification")
+                for execution in retry_executions:
+                    account = execution.account
+                    if account and account.is_active and account.id not in broker_snapshots:
+                        broker_snapshots[account.id] = fetch_broker_snapshot(self._get_client(account))
 
                 for idx, exec_id in enumerate(execution_ids):
-                    # Log phase transitions
-                    if idx == sell_count and sell_positions and buy_positions:
-                        logger.info(f"[SUPERTREND EXIT PHASE 2] All SELL positions closed. Starting BUY position exits...")
-                        print(f"[SUPERTREND EXIT PHASE 2] All SELL positions closed. Starting BUY position exits...")
                     try:
-                        # ATOMIC DUPLICATE PREVENTION: Single SQL UPDATE claims this execution.
-                        # Only ONE thread/service can succeed - all others get rowcount=0 and skip.
-                        # This replaces the old can_attempt_exit() + mark_exit_pending() two-step
-                        # which had a TOCTOU race on SQLite (with_for_update is a no-op on SQLite).
-                        if is_retry_event:
-                            claimed = atomic_claim_exit_retry(exec_id, exit_reason)
-                        else:
-                            claimed = atomic_claim_exit(exec_id, exit_reason)
-
-                        if not claimed:
-                            logger.info(f"[SUPERTREND EXIT] Execution {exec_id}: SKIPPING - atomic claim failed")
+                        if exec_id not in claimed_ids:
+                            logger.debug(f"[SUPERTREND EXIT] Execution {exec_id}: SKIPPING - atomic claim failed")
                             continue
 
-                        # Successfully claimed - re-fetch to get field values
-                        execution = StrategyExecution.query.get(exec_id)
+                        execution = claimed_executions.get(exec_id)
                         if not execution:
                             logger.warning(f"[SUPERTREND EXIT] Execution {exec_id} not found after claim")
                             continue
 
-                        logger.info(f"[SUPERTREND EXIT] Execution {exec_id}: CLAIMED - proceeding with exit")
+                        logger.debug(f"[SUPERTREND EXIT] Execution {exec_id}: CLAIMED - proceeding with exit")
 
                         # Use the execution's account (NOT primary account)
                         account = execution.account
@@ -712,12 +897,7 @@ class SupertrendExitService:
                             continue
 
                         # Get or create client for this account
-                        if account.id not in account_clients:
-                            account_clients[account.id] = ExtendedOpenAlgoAPI(
-                                api_key=account.get_api_key(),
-                                host=account.host_url
-                            )
-                        client = account_clients[account.id]
+                        client = self._get_client(account)
 
                         # Get entry action from leg
                         leg = execution.leg
@@ -736,92 +916,164 @@ class SupertrendExitService:
                         # DUPLICATE PREVENTION: For retry attempts, verify with broker before placing order
                         # This prevents duplicate orders when the previous attempt actually succeeded
                         attempt_count = execution.exit_attempt_count or 0
-                        if attempt_count > 1:  # This is a retry
+                        if retry_executions and attempt_count > 1:  # This is a retry
                             logger.info(f"[SUPERTREND EXIT] Retry attempt #{attempt_count} for {exec_symbol} - verifying with broker first")
 
-                            verification = verify_exit_order_at_broker(client, execution, strategy.name)
+                            verification = verify_exit_order_at_broker_cached(broker_snapshots[account.id], execution)
 
+                            # Verification outcomes are only staged on the session here and
+                            # committed together after the loop (no SAVEPOINTs: pysqlite does not
+                            # scope them without its BEGIN workaround)
                             if not verification['can_place_exit']:
                                 if verification['order_status'] == 'complete':
                                     # Exit order already completed at broker - mark as confirmed
                                     logger.info(f"[SUPERTREND EXIT] BROKER VERIFICATION: Exit already complete for {exec_symbol}")
-                                    mark_exit_confirmed(execution, 'complete', verification['order_id'])
+                                    mark_exit_confirmed(execution, 'complete', verification['order_id'],
+                                                        commit=False, now=now)
                                     success_count += 1
                                     continue
                                 elif verification['position_quantity'] == 0:
                                     # Position already closed at broker
                                     logger.info(f"[SUPERTREND EXIT] BROKER VERIFICATION: Position already closed for {exec_symbol}")
-                                    from app import db
                                     execution.status = 'exited'
                                     execution.exit_reason = 'broker_confirmed_closed'
-                                    execution.exit_time = datetime.utcnow()
-                                    db.session.commit()
+                                    execution.exit_time = now
                                     success_count += 1
                                     continue
                                 else:
                                     # Exit order exists but not complete (open/pending) - skip retry
                                     logger.warning(f"[SUPERTREND EXIT] BROKER VERIFICATION: {verification['message']} - skipping retry")
-                                    db.session.rollback()
                                     continue
                             else:
                                 logger.info(f"[SUPERTREND EXIT] BROKER VERIFICATION: Safe to place exit for {exec_symbol}")
 
-                        logger.info(f"[SUPERTREND EXIT] Placing exit for {exec_symbol} on {account.account_name}, action={exit_action}, qty={exec_quantity}, product={exit_product}")
-
-                        # Place exit order ONCE - no internal retry loop
-                        # If this fails, the external retry mechanism (10 seconds later) will handle it
-                        # with proper broker verification to prevent duplicate orders
-                        from app.utils.freeze_quantity_handler import place_order_with_freeze_check
-
-                        response = None
-                        try:
-                            response = place_order_with_freeze_check(
-                                client=client,
-                                user_id=strategy.user_id,
-                                strategy=strategy.name,
-                                symbol=exec_symbol,
-                                exchange=exec_exchange,
-                                action=exit_action,
-                                quantity=exec_quantity,
-                                price_type='MARKET',
-                                product=exit_product
-                            )
-                            logger.info(f"[SUPERTREND EXIT] Order response for {exec_symbol}: {response}")
-                        except Exception as api_error:
-                            logger.warning(f"[SUPERTREND EXIT] API error for {exec_symbol} on {account.account_name}: {api_error}")
-                            response = {'status': 'error', 'message': f'API error: {api_error}'}
-
-                        # Re-fetch execution to update order ID
-                        execution = StrategyExecution.query.get(exec_id)
-
-                        if response and response.get('status') == 'success':
-                            order_id = response.get('orderid')
-
-                            # DUPLICATE PREVENTION: Mark exit as successful with order ID
-                            mark_exit_success(execution, order_id)
-                            success_count += 1
-
-                            # Add exit order to polling queue
-                            order_status_poller.add_order(
-                                execution_id=execution.id,
-                                account=account,
-                                order_id=order_id,
-                                strategy_name=strategy.name
-                            )
+                        logger.debug(f"[SUPERTREND EXIT] Queueing exit for {exec_symbol} on {account.account_name}, action={exit_action}, qty={exec_quantity}, product={exit_product}")
+                        queued_exits.append({
+                            'exec_id': exec_id,
+                            'symbol': exec_symbol,
+                            'account': account,
+                            'account_name': account.account_name,
+                            'client': client,
+                            'phase': 1 if idx < sell_count else 2,
+                            'retry': attempt_count > 1,
+                            'order': {
+                                'symbol': exec_symbol,
+                                'exchange': exec_exchange,
+                                'action': exit_action,
+                                'quantity': exec_quantity,
+                                'price_type': 'MARKET',
+                                'product': exit_product
+                            }
+                        })
 
-                            logger.info(f"[SUPERTREND EXIT] Exit order {order_id} placed for {exec_symbol} on {account.account_name}")
-                        else:
-                            error_msg = response.get('message', 'Unknown error') if response else 'No response'
-                            logger.error(f"[SUPERTREND EXIT] Failed to place exit for {exec_symbol} on {account.account_name}: {error_msg}")
+                    except Exception as e:
+                        logger.error(f"[SUPERTREND EXIT] Exception closing execution {exec_id}: {str(e)}", exc_info=True)
 
-                            # DUPLICATE PREVENTION: Mark exit as failed but keep status as 'exit_pending'
-                            # This prevents duplicate orders - the retry mechanism will verify with broker
-                            # before placing another order after the retry delay (10 seconds)
-                            mark_exit_failed(execution, error_msg, needs_broker_verification=True)
+                # Commit the verification outcomes once, before any broker call. If that fails
+                # the rows stay exit_pending and the next retry verifies them again
+                if retry_executions:
+                    try:
+                        db.session.commit()
+                    except Exception as e:
+                        logger.error(f"[SUPERTREND EXIT] Failed to record broker verification outcomes: {e}", exc_info=True)
+                        db.session.rollback()
+
+                # Place exit orders ONCE - no internal retry loop
+                # If this fails, the external retry mechanism (10 seconds later) will handle it
+                # with proper broker verification to prevent duplicate orders.
+                # SELL-leg closes go out before BUY-leg closes; within a phase, first attempts on
+                # one account share a single basket order, retries are placed one by one
+                for phase in (1, 2):
+                    phase_exits = [queued for queued in queued_exits if queued['phase'] == phase]
+                    if phase_exits:
+                        # Verification and phase 1 can outlast the claim lease - renew it before
+                        # the broker calls and leave expired rows to the retry path
+                        held_ids = renew_exit_claims([queued['exec_id'] for queued in phase_exits])
+                        phase_exits = [queued for queued in phase_exits if queued['exec_id'] in held_ids]
+                    if phase == 2 and sell_positions and buy_positions:
+                        logger.info(f"[SUPERTREND EXIT PHASE 2] All SELL positions closed. Starting BUY position exits...")
+                        if current_app.debug:
+                            print(f"[SUPERTREND EXIT PHASE 2] All SELL positions closed. Starting BUY position exits...")
+
+                    order_groups = [[queued] for queued in phase_exits if queued['retry']]
+                    batches = {}
+                    for queued in phase_exits:
+                        if not queued['retry']:
+                            batches.setdefault(queued['account'].id, []).append(queued)
+                    order_groups.extend(batches.values())
+
+                    if not order_groups:
+                        continue
+
+                    # Groups go to different accounts (or are independent retries), so their
+                    # broker calls run concurrently; the phase still finishes before the next.
+                    # Results are recorded on this thread, in this session
+                    user_id, strategy_name = strategy.user_id, strategy.name
+                    if len(order_groups) == 1:
+                        group_results = [self._place_exit_group(app, user_id, strategy_name, order_groups[0])]
+                    else:
+                        group_results = list(self._exit_executor.map(
+                            lambda group: self._place_exit_group(app, user_id, strategy_name, group),
+                            order_groups
+                        ))
+
+                    placed = []  # (order_id, queued) for the whole phase
+                    failed_exits = {}  # error message -> execution IDs
+                    for group, responses in zip(order_groups, group_results):
+                        for queued, response in zip(group, responses):
+                            exec_id = queued['exec_id']
+                            exec_symbol = queued['symbol']
+                            try:
+                                logger.debug(f"[SUPERTREND EXIT] Order response for {exec_symbol}: {response}")
+
+                                if response and response.get('status') == 'success':
+                                    order_id = response.get('orderid')
+
+                                    # DUPLICATE PREVENTION: Mark exit as successful with order ID
+                                    # (the claimed row is still in this session - no re-fetch)
+                                    execution = claimed_executions[exec_id]
+                                    mark_exit_success(execution, order_id, commit=False, now=now)
+                                    placed.append((order_id, queued))
+                                else:
+                                    error_msg = response.get('message', 'Unknown error') if response else 'No response'
+                                    logger.error(f"[SUPERTREND EXIT] Failed to place exit for {exec_symbol} on {queued['account_name']}: {error_msg}")
+
+                                    # DUPLICATE PREVENTION: Mark exit as failed but keep status as 'exit_pending'
+                                    # This prevents duplicate orders - the retry mechanism will verify with broker
+                                    # before placing another order after the retry delay (10 seconds).
+                                    # Failures are marked together after the phase, one UPDATE per distinct error
+                                    failed_exits.setdefault(error_msg, []).append(exec_id)
+
+                            except Exception as e:
+                                logger.error(f"[SUPERTREND EXIT] Exception closing execution {exec_id}: {str(e)}", exc_info=True)
 
+                    # Failures keep their own clock: the retry cooldown must start after the
+                    # (possibly slow) placement attempt, not at the start of the cycle
+                    for error_msg, failed_ids in failed_exits.items():
+                        mark_exits_failed_bulk(failed_ids, error_msg, commit=False)
+
+                    # One commit records the whole phase (order IDs and failures) before the
+                    # next phase's broker calls
+                    try:
+                        db.session.commit()
                     except Exception as e:
-                        logger.error(f"[SUPERTREND EXIT] Exception closing execution {exec_id}: {str(e)}", exc_info=True)
-                        db.session.rollback()  # Release lock on exception
+                        logger.error(f"[SUPERTREND EXIT] Failed to record phase {phase} exit orders "
+                                     f"{[order_id for order_id, _ in placed]}: {e}", exc_info=True)
+                        db.session.rollback()
+                        continue
+
+                    if not placed:
+                        continue
+
+                    # Add the phase's exit orders to the polling queue in one call
+                    order_status_poller.add_orders(
+                        (queued['exec_id'], queued['account'], order_id, strategy.name)
+                        for order_id, queued in placed
+                    )
+                    success_count += len(placed)
+
+                    for order_id, queued in placed:
+                        logger.info(f"[SUPERTREND EXIT] Exit order {order_id} placed for {queued['symbol']} on {queued['account_name']}")
 
                 # VERIFICATION: Check for missing/failed orders
                 fail_count = len(execution_ids) - success_count
@@ -829,20 +1081,49 @@ class SupertrendExitService:
                     logger.error(f"[SUPERTREND EXIT] WARNING: {fail_count} exit orders FAILED out of {len(execution_ids)} total!")
                     print(f"[SUPERTREND EXIT] CRITICAL: {fail_count} orders failed - will retry after {EXIT_RETRY_DELAY_SECONDS}s")
 
-                    # Log which executions are pending retry
-                    for exec_id in execution_ids:
-                        try:
-                            exec_check = StrategyExecution.query.get(exec_id)
-                            if exec_check and exec_check.status == 'exit_pending' and not exec_check.exit_order_id:
-                                logger.warning(f"[SUPERTREND EXIT] PENDING RETRY: Execution {exec_id} ({exec_check.symbol}) - retry after {exec_check.exit_retry_after}")
-                                print(f"[SUPERTREND EXIT] PENDING: {exec_check.symbol} - retry after {exec_check.exit_retry_after}")
-                        except Exception:
-                            pass
+                    # Log which executions are pending retry (one SELECT for all of them)
+                    pending_checks = StrategyExecution.query.filter(
+                        StrategyExecution.id.in_(execution_ids),
+                        StrategyExecution.status == 'exit_pending',
+                        StrategyExecution.exit_order_id.is_(None)
+                    ).all()
+                    for exec_check in pending_checks:
+                        logger.warning(f"[SUPERTREND EXIT] PENDING RETRY: Execution {exec_check.id} ({exec_check.symbol}) - retry after {exec_check.exit_retry_after}")
+                        print(f"[SUPERTREND EXIT] PENDING: {exec_check.symbol} - retry after {exec_check.exit_retry_after}")
 
                 logger.info(f"[SUPERTREND EXIT] Completed: {success_count}/{len(execution_ids)} exit orders placed")
 
         except Exception as e:
             logger.error(f"[SUPERTREND EXIT] Error in trigger_sequential_exit: {e}", exc_info=True)
+            # The session may be the caller's now - don't leave it in a failed transaction
+            from app import db
+            db.session.rollback()
+
+
+OHLC_COLUMNS = ['open', 'high', 'low', 'close']
+
+
+def _sum_weighted_ohlc(legs, index):
+    """
+    Sum lot-weighted OHLC for the legs on one side of a spread.
+
+    Every leg is taken on `index` (the bars all legs of the spread share), so the sum
+    is plain addition - a bar one leg lacks is dropped rather than counted as 0.
+
+    Returns:
+        ohlc ndarray of shape (n_bars, 4), or None if there are no legs
+    """
+    if not legs:
+        return None
+
+    total = np.zeros((len(index), len(OHLC_COLUMNS)), dtype=np.float64)
+    scaled = np.empty_like(total)
+    for df, lots in legs:
+        ohlc = df[OHLC_COLUMNS] if df.index.equals(index) else df[OHLC_COLUMNS].reindex(index)
+        # Scale into a scratch buffer, never in place: frames may be shared via the candle cache
+        np.multiply(ohlc.to_numpy(dtype=np.float64), lots, out=scaled)
+        total += scaled
+    return total
 
 
 # Global service instance
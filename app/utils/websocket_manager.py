@@ -134,7 +134,7 @@ class ProfessionalWebSocketManager:
         self.subscriptions = {}  # {mode: [instruments]}
         self.active = False
         self.client = None
-        self.authenticated = False
+        self.auth_event = threading.Event()  # Set while authenticated; lets callers wait without polling
         self._lock = create_lock()
 
         # Connection parameters
@@ -147,6 +147,18 @@ class ProfessionalWebSocketManager:
         self._valid_ltp_cache = {}  # {symbol_key: last_valid_ltp}
         self._valid_quote_cache = {}  # {symbol_key: last_valid_quote}
 
+    @property
+    def authenticated(self) -> bool:
+        """True once the WebSocket connection is authenticated"""
+        return self.auth_event.is_set()
+
+    @authenticated.setter
+    def authenticated(self, value: bool):
+        if value:
+            self.auth_event.set()
+        else:
+            self.auth_event.clear()
+
     def create_connection_pool(self, primary_account, backup_accounts=None):
         """
         Create managed connection pool with multi-account failover capability
@@ -33,7 +33,9 @@ class Config:
             'timeout': 30  # Wait up to 30 seconds for locks to clear
         },
         'pool_pre_ping': True,  # Verify connections before using
-        'pool_recycle': 3600,   # Recycle connections every hour
+        'pool_recycle': 1800,   # Recycle connections every 30 minutes
+        'pool_size': 10,        # Request threads and the scheduler share the pool
+        'max_overflow': 20,
     }
     
     # Session configuration
@@ -0,0 +1,53 @@
+"""
+Migration: Add partial indexes for the exit retry and claim queries
+
+The exit sweep filters strategy_executions on a tiny, hot subset of rows:
+- get_pending_exit_retries: status='exit_pending', no exit_order_id, retry timer expired
+- atomic_claim_exit / open position lookups: status='entered'
+
+Partial indexes cover only those rows, so the lookups stay small as
+execution history grows.
+"""
+
+from sqlalchemy import text
+
+
+def upgrade(db):
+    """Add partial indexes for exit processing"""
+
+    # Helper to check if index exists
+    def index_exists(index_name):
+        result = db.session.execute(text(
+            f"SELECT name FROM sqlite_master WHERE type='index' AND name='{index_name}'"
+        ))
+        return result.fetchone() is not None
+
+    indexes_to_create = [
+        ('ix_exec_pending_retry',
+         "CREATE INDEX ix_exec_pending_retry ON strategy_executions(strategy_id, exit_retry_after) "
+         "WHERE status = 'exit_pending' AND exit_order_id IS NULL"),
+        ('ix_exec_entered',
+         "CREATE INDEX ix_exec_entered ON strategy_executions(strategy_id) "
+         "WHERE status = 'entered'"),
+    ]
+
+    created_count = 0
+    for index_name, create_sql in indexes_to_create:
+        if index_exists(index_name):
+            print(f"  Index {index_name} already exists, skipping")
+        else:
+            db.session.execute(text(create_sql))
+            print(f"  Created index {index_name}")
+            created_count += 1
+
+    db.session.commit()
+    print(f"  Created {created_count} index(es)")
+
+
+def downgrade(db):
+    """Remove partial indexes"""
+    for index_name in ['ix_exec_pending_retry', 'ix_exec_entered']:
+        db.session.execute(text(f"DROP INDEX IF EXISTS {index_name}"))
+        print(f"  Dropped index {index_name}")
+
+    db.session.commit()
@@ -0,0 +1,52 @@
+"""
+Migration: Enforce at most one open execution per leg per account
+
+The atomic exit claims stop two services from placing an exit for the same
+execution, but nothing stopped a second open execution for the same leg on
+the same account. A unique partial index over the open statuses makes that
+state impossible regardless of code path.
+
+Existing databases that already hold such duplicates are left unchanged -
+the duplicates are listed so they can be resolved before re-running.
+"""
+
+from sqlalchemy import text
+
+INDEX_NAME = 'ix_exec_one_open_per_leg'
+
+
+def upgrade(db):
+    """Add unique partial index on open executions"""
+
+    result = db.session.execute(text(
+        f"SELECT name FROM sqlite_master WHERE type='index' AND name='{INDEX_NAME}'"
+    ))
+    if result.fetchone() is not None:
+        print(f"  Index {INDEX_NAME} already exists, skipping")
+        return
+
+    duplicates = db.session.execute(text(
+        "SELECT strategy_id, account_id, leg_id, COUNT(*) FROM strategy_executions "
+        "WHERE status IN ('entered', 'exit_pending') "
+        "GROUP BY strategy_id, account_id, leg_id HAVING COUNT(*) > 1"
+    )).fetchall()
+
+    if duplicates:
+        print(f"  Found {len(duplicates)} leg(s) with more than one open execution, skipping {INDEX_NAME}:")
+        for strategy_id, account_id, leg_id, count in duplicates:
+            print(f"    strategy={strategy_id} account={account_id} leg={leg_id}: {count} open executions")
+        return
+
+    db.session.execute(text(
+        f"CREATE UNIQUE INDEX {INDEX_NAME} ON strategy_executions(strategy_id, account_id, leg_id) "
+        "WHERE status IN ('entered', 'exit_pending')"
+    ))
+    db.session.commit()
+    print(f"  Created index {INDEX_NAME}")
+
+
+def downgrade(db):
+    """Remove unique partial index"""
+    db.session.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
+    db.session.commit()
+    print(f"  Dropped index {INDEX_NAME}")
@@ -0,0 +1,37 @@
+"""
+Migration: Add partial index for the Supertrend monitor query
+
+monitor_strategies runs every minute and selects active strategies with
+Supertrend exit enabled, split by supertrend_exit_triggered. Only a few
+strategies ever enable the exit, so a partial index over those rows keeps
+the lookup off a full scan of the strategies table.
+"""
+
+from sqlalchemy import text
+
+INDEX_NAME = 'ix_strategy_supertrend_active'
+
+
+def upgrade(db):
+    """Add partial index on Supertrend-enabled strategies"""
+
+    result = db.session.execute(text(
+        f"SELECT name FROM sqlite_master WHERE type='index' AND name='{INDEX_NAME}'"
+    ))
+    if result.fetchone() is not None:
+        print(f"  Index {INDEX_NAME} already exists, skipping")
+        return
+
+    db.session.execute(text(
+        f"CREATE INDEX {INDEX_NAME} ON strategies(is_active, supertrend_exit_triggered) "
+        "WHERE supertrend_exit_enabled = 1"
+    ))
+    db.session.commit()
+    print(f"  Created index {INDEX_NAME}")
+
+
+def downgrade(db):
+    """Remove partial index"""
+    db.session.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
+    db.session.commit()
+    print(f"  Dropped index {INDEX_NAME}")
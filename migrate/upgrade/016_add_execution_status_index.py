@@ -0,0 +1,52 @@
+"""
+Migration: Add composite index for the exit trigger queries
+
+trigger_sequential_exit selects a strategy's executions by status with no
+exit_order_id ('entered', or 'entered'/'exit_pending' on retries). The
+partial indexes from 013 each cover one status; this index serves both
+forms of the query with a seek on (strategy_id, status, exit_order_id).
+
+It has 009's ix_strategy_executions_strategy_status (strategy_id, status)
+as its prefix, so that index is dropped here rather than maintained twice.
+"""
+
+from sqlalchemy import text
+
+INDEX_NAME = 'ix_exec_strategy_status_exit'
+REPLACED_INDEX_NAME = 'ix_strategy_executions_strategy_status'
+
+
+def _index_exists(db, name):
+    result = db.session.execute(text(
+        f"SELECT name FROM sqlite_master WHERE type='index' AND name='{name}'"
+    ))
+    return result.fetchone() is not None
+
+
+def upgrade(db):
+    """Add composite index on strategy_id, status, exit_order_id, replacing the (strategy_id, status) index"""
+
+    if _index_exists(db, INDEX_NAME):
+        print(f"  Index {INDEX_NAME} already exists, skipping")
+    else:
+        db.session.execute(text(
+            f"CREATE INDEX {INDEX_NAME} ON strategy_executions(strategy_id, status, exit_order_id)"
+        ))
+        print(f"  Created index {INDEX_NAME}")
+
+    # Checked separately so a database that already ran the first version of this migration loses it too
+    if _index_exists(db, REPLACED_INDEX_NAME):
+        db.session.execute(text(f"DROP INDEX {REPLACED_INDEX_NAME}"))
+        print(f"  Dropped index {REPLACED_INDEX_NAME} (covered by {INDEX_NAME})")
+
+    db.session.commit()
+
+
+def downgrade(db):
+    """Remove composite index and restore the (strategy_id, status) index"""
+    db.session.execute(text(
+        f"CREATE INDEX IF NOT EXISTS {REPLACED_INDEX_NAME} ON strategy_executions(strategy_id, status)"
+    ))
+    db.session.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
+    db.session.commit()
+    print(f"  Restored index {REPLACED_INDEX_NAME}, dropped index {INDEX_NAME}")
@@ -0,0 +1,42 @@
+"""
+Migration: Drop the unique open-execution-per-leg index
+
+ix_exec_one_open_per_leg (014) turned a second fill on a leg into an
+IntegrityError. Most paths that move an execution to 'entered' (poller,
+broker sync, manual and strategy routes) cannot recover from that: the
+fill is either rolled back with the rest of the session or left outside
+the states the exit sweeps close. A real broker position nobody exits is
+worse than the duplicate the index guarded against, so it is removed and
+duplicate prevention stays with the atomic exit claims.
+"""
+
+from sqlalchemy import text
+
+INDEX_NAME = 'ix_exec_one_open_per_leg'
+
+
+def upgrade(db):
+    """Drop unique partial index on open executions"""
+    db.session.execute(text(f"DROP INDEX IF EXISTS {INDEX_NAME}"))
+    db.session.commit()
+    print(f"  Dropped index {INDEX_NAME} (if it existed)")
+
+
+def downgrade(db):
+    """Restore unique partial index (skipped if open duplicates exist)"""
+
+    duplicates = db.session.execute(text(
+        "SELECT COUNT(*) FROM (SELECT 1 FROM strategy_executions "
+        "WHERE status IN ('entered', 'exit_pending') "
+        "GROUP BY strategy_id, account_id, leg_id HAVING COUNT(*) > 1)"
+    )).scalar()
+    if duplicates:
+        print(f"  {duplicates} leg(s) have more than one open execution, not restoring {INDEX_NAME}")
+        return
+
+    db.session.execute(text(
+        f"CREATE UNIQUE INDEX IF NOT EXISTS {INDEX_NAME} ON strategy_executions(strategy_id, account_id, leg_id) "
+        "WHERE status IN ('entered', 'exit_pending')"
+    ))
+    db.session.commit()
+    print(f"  Created index {INDEX_NAME}")
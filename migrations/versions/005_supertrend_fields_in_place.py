@@ -0,0 +1,44 @@
+"""Add any missing Supertrend exit fields in place
+
+Revision ID: 005_supertrend_fields_in_place
+Revises: 004_fix_trade_quality_labels
+Create Date: 2026-10-15
+
+002 adds the Supertrend columns through batch_alter_table. On SQLite that
+path may copy the whole strategy table. Databases that were stamped past 002
+without running it are brought up to date here with plain
+ALTER TABLE ... ADD COLUMN statements and constant defaults. SQLite applies
+those in place, without a table copy. Columns that already exist are
+skipped, so this is a no-op wherever 002 ran.
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '005_supertrend_fields_in_place'
+down_revision = '004_fix_trade_quality_labels'
+branch_labels = None
+depends_on = None
+
+SUPERTREND_COLUMNS = [
+    ('supertrend_exit_enabled', 'BOOLEAN DEFAULT 0'),
+    ('supertrend_exit_type', 'VARCHAR(20)'),
+    ('supertrend_period', 'INTEGER DEFAULT 7'),
+    ('supertrend_multiplier', 'FLOAT DEFAULT 3.0'),
+    ('supertrend_timeframe', "VARCHAR(10) DEFAULT '5m'"),
+    ('supertrend_exit_triggered', 'BOOLEAN DEFAULT 0'),
+]
+
+
+def upgrade():
+    """Add missing Supertrend columns to the strategy table without recreating it"""
+    existing = {column['name'] for column in sa.inspect(op.get_bind()).get_columns('strategy')}
+    for name, definition in SUPERTREND_COLUMNS:
+        if name not in existing:
+            op.execute(f"ALTER TABLE strategy ADD COLUMN {name} {definition}")
+
+
+def downgrade():
+    """Nothing to undo - the columns belong to 002, whose downgrade drops them"""
+    pass
@@ -0,0 +1,58 @@
+"""
+Shared pytest fixtures: an app bound to a throwaway SQLite database
+"""
+
+import os
+import tempfile
+
+import pytest
+
+_tmp_dir = tempfile.mkdtemp(prefix='algomirror-tests-')
+os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(_tmp_dir, 'test.db')
+os.environ.setdefault('SESSION_FILE_DIR', os.path.join(_tmp_dir, 'flask_session'))
+
+from app import create_app, db  # noqa: E402
+from app.models import User, Strategy, StrategyLeg, TradingAccount  # noqa: E402
+from app.utils.background_service import option_chain_service  # noqa: E402
+from app.utils.order_status_poller import order_status_poller  # noqa: E402
+from app.utils.supertrend_exit_service import supertrend_exit_service  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def flask_app():
+    """One app per run, with the background services create_app starts stopped again"""
+    app = create_app('development')
+    option_chain_service.stop_service()
+    order_status_poller.stop()
+    supertrend_exit_service.stop_service()
+    return app
+
+
+@pytest.fixture
+def app(flask_app):
+    with flask_app.app_context():
+        db.create_all()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def strategy(app):
+    """A strategy with one account and three legs"""
+    user = User(username='trader', email='trader@example.com', password_hash='x')
+    db.session.add(user)
+    db.session.commit()
+
+    account = TradingAccount(user_id=user.id, account_name='primary', broker_name='broker',
+                             host_url='http://broker', websocket_url='ws://broker',
+                             api_key_encrypted='x', is_active=True)
+    strategy = Strategy(user_id=user.id, name='spread', is_active=True)
+    db.session.add_all([account, strategy])
+    db.session.commit()
+
+    for number in range(1, 4):
+        db.session.add(StrategyLeg(strategy_id=strategy.id, leg_number=number,
+                                   instrument='NIFTY', action='SELL'))
+    db.session.commit()
+    return strategy
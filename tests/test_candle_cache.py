@@ -0,0 +1,81 @@
+"""
+Tests for candle boundaries and CandleCache expiry
+"""
+
+from datetime import datetime, timedelta, timezone
+
+import pandas as pd
+import pytest
+
+from app.utils import candle_cache as candle_cache_module
+from app.utils.candle_cache import CandleCache, next_candle_boundary
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def _epoch(hour, minute, second=0):
+    return datetime(2026, 1, 5, hour, minute, second, tzinfo=IST).timestamp()
+
+
+@pytest.mark.parametrize('interval, closes_at', [
+    ('3m', (9, 18)),
+    ('5m', (9, 20)),
+    ('10m', (9, 20)),
+    ('15m', (9, 30)),
+    ('unknown', (9, 20)),  # falls back to the default 5m timeframe
+])
+def test_boundary_lands_on_ist_candle_close(interval, closes_at):
+    assert next_candle_boundary(interval, _epoch(9, 16, 30)) == _epoch(*closes_at)
+
+
+def test_boundary_on_candle_close_moves_to_next_candle():
+    assert next_candle_boundary('5m', _epoch(9, 20)) == _epoch(9, 25)
+
+
+class Clock:
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock(_epoch(9, 16))
+    monkeypatch.setattr(candle_cache_module.time, 'time', clock)
+    return clock
+
+
+def _fetcher(calls, result=None):
+    def fetch():
+        calls.append(1)
+        return pd.DataFrame({'close': [len(calls)]}) if result is None else result
+    return fetch
+
+
+def test_fetch_is_shared_until_candle_closes(clock):
+    cache = CandleCache()
+    calls = []
+    fetch = _fetcher(calls)
+
+    first = cache.get_or_fetch('NIFTY', 'NFO', '5m', '2026-01-01', '2026-01-05', fetch)
+    clock.now = _epoch(9, 19, 59)
+    assert cache.get_or_fetch('NIFTY', 'NFO', '5m', '2026-01-01', '2026-01-05', fetch) is first
+    assert len(calls) == 1
+
+    # The 9:15 candle closes at 9:20 - the next check sees the new bar
+    clock.now = _epoch(9, 20)
+    second = cache.get_or_fetch('NIFTY', 'NFO', '5m', '2026-01-01', '2026-01-05', fetch)
+    assert second is not first
+    assert len(calls) == 2
+
+
+def test_error_responses_are_not_cached(clock):
+    cache = CandleCache()
+    calls = []
+    fetch = _fetcher(calls, result={'status': 'error', 'message': 'rate limited'})
+
+    cache.get_or_fetch('NIFTY', 'NFO', '5m', '2026-01-01', '2026-01-05', fetch)
+    cache.get_or_fetch('NIFTY', 'NFO', '5m', '2026-01-01', '2026-01-05', fetch)
+    assert len(calls) == 2
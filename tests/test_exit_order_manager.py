@@ -0,0 +1,116 @@
+"""
+Tests for the bulk claim / fail SQL in exit_order_manager
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from app.models import StrategyExecution, StrategyLeg, TradingAccount
+from app.utils.exit_order_manager import (
+    atomic_claim_exits_bulk, renew_exit_claims, mark_exits_failed_bulk,
+    EXIT_RETRY_DELAY_SECONDS, MAX_EXIT_ATTEMPTS
+)
+
+
+@pytest.fixture
+def executions(strategy):
+    """Two open executions and one already exited"""
+    account = TradingAccount.query.filter_by(user_id=strategy.user_id).one()
+    rows = [
+        StrategyExecution(strategy_id=strategy.id, account_id=account.id, leg_id=leg.id,
+                          symbol=f'NIFTY{leg.leg_number}CE', exchange='NFO', quantity=75,
+                          status='exited' if leg.leg_number == 3 else 'entered')
+        for leg in strategy.legs.order_by(StrategyLeg.leg_number)
+    ]
+    db.session.add_all(rows)
+    db.session.commit()
+    return [row.id for row in rows]
+
+
+def _rows():
+    db.session.expire_all()
+    return {row.id: row for row in StrategyExecution.query.all()}
+
+
+@pytest.fixture(params=[True, False], ids=['returning', 'rowcount'])
+def update_returning(request, app, monkeypatch):
+    """Run a test both with UPDATE ... RETURNING and with the per-row fallback"""
+    monkeypatch.setattr(db.session.get_bind().dialect, 'update_returning', request.param)
+    return request.param
+
+
+def test_bulk_claim_takes_only_open_rows(executions, update_returning):
+    now = datetime.utcnow()
+    claimed = atomic_claim_exits_bulk(executions, 'max_loss', now=now)
+
+    assert claimed == set(executions[:2])
+    rows = _rows()
+    for execution_id in executions[:2]:
+        assert rows[execution_id].status == 'exit_pending'
+        assert rows[execution_id].exit_reason == 'max_loss'
+        assert rows[execution_id].exit_attempt_count == 1
+        # The lease is one retry delay, however many rows were claimed together
+        assert rows[execution_id].exit_retry_after == now + timedelta(seconds=EXIT_RETRY_DELAY_SECONDS)
+    assert rows[executions[2]].status == 'exited'
+
+    # A second claim finds nothing left to take
+    assert atomic_claim_exits_bulk(executions, 'max_loss') == set()
+
+
+def test_bulk_retry_claim_waits_for_expired_lease(executions, update_returning):
+    now = datetime.utcnow()
+    atomic_claim_exits_bulk(executions, 'max_loss', now=now)
+
+    assert atomic_claim_exits_bulk(executions, 'max_loss_retry', retry=True, now=now) == set()
+
+    later = now + timedelta(seconds=EXIT_RETRY_DELAY_SECONDS + 1)
+    assert atomic_claim_exits_bulk(executions, 'max_loss_retry', retry=True, now=later) == set(executions[:2])
+    assert _rows()[executions[0]].exit_attempt_count == 2
+
+
+def test_bulk_retry_claim_stops_at_max_attempts(executions):
+    db.session.execute(
+        db.update(StrategyExecution)
+        .where(StrategyExecution.id == executions[0])
+        .values(status='exit_pending', exit_attempt_count=MAX_EXIT_ATTEMPTS,
+                exit_retry_after=datetime.utcnow() - timedelta(seconds=1))
+    )
+    db.session.commit()
+
+    assert atomic_claim_exits_bulk([executions[0]], 'retry', retry=True) == set()
+
+
+def test_renew_keeps_live_leases_only(executions, update_returning):
+    now = datetime.utcnow()
+    atomic_claim_exits_bulk(executions, 'max_loss', now=now)
+
+    later = now + timedelta(seconds=EXIT_RETRY_DELAY_SECONDS - 1)
+    assert renew_exit_claims(executions[:2], now=later) == set(executions[:2])
+    assert _rows()[executions[0]].exit_retry_after == later + timedelta(seconds=EXIT_RETRY_DELAY_SECONDS)
+
+    expired = later + timedelta(seconds=EXIT_RETRY_DELAY_SECONDS + 1)
+    assert renew_exit_claims(executions[:2], now=expired) == set()
+
+
+def test_bulk_fail_only_touches_pending_rows_without_exit_order(executions):
+    now = datetime.utcnow()
+    atomic_claim_exits_bulk(executions[:2], 'max_loss', now=now)
+    db.session.execute(
+        db.update(StrategyExecution)
+        .where(StrategyExecution.id == executions[1])
+        .values(exit_order_id='ORDER1')
+    )
+    db.session.commit()
+
+    assert mark_exits_failed_bulk(executions, 'broker down', now=now) == 1
+
+    rows = _rows()
+    assert rows[executions[0]].error_message == 'broker down'
+    assert rows[executions[0]].exit_broker_verified is False
+    assert rows[executions[0]].exit_retry_after == now + timedelta(seconds=EXIT_RETRY_DELAY_SECONDS)
+    assert rows[executions[1]].error_message is None
+    # An exited row is not pulled back into EXIT_PENDING
+    assert rows[executions[2]].status == 'exited'
+    assert rows[executions[2]].error_message is None
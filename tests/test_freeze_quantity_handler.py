@@ -0,0 +1,85 @@
+"""
+Tests for basket order placement in place_orders_with_freeze_check
+"""
+
+from app.utils.freeze_quantity_handler import place_orders_with_freeze_check
+
+
+class FakeClient:
+    """Records calls; basketorder answers with results in reverse request order"""
+
+    def __init__(self, failing=(), basket_response=None):
+        self.failing = set(failing)
+        self.basket_response = basket_response
+        self.calls = []
+
+    def basketorder(self, strategy, orders):
+        self.calls.append(('basket', [order['symbol'] for order in orders]))
+        if self.basket_response is not None:
+            return self.basket_response
+        results = []
+        for number, order in enumerate(orders, start=1):
+            if order['symbol'] in self.failing:
+                results.append({'symbol': order['symbol'], 'status': 'error', 'message': 'rejected'})
+            else:
+                results.append({'symbol': order['symbol'], 'status': 'success', 'orderid': f"B{number}"})
+        return {'status': 'success', 'results': list(reversed(results))}
+
+    def placeorder(self, **order):
+        self.calls.append(('single', [order['symbol']]))
+        return {'status': 'success', 'orderid': f"P-{order['symbol']}"}
+
+    def splitorder(self, **order):
+        self.calls.append(('split', [order['symbol']]))
+        return {'status': 'success', 'results': [{'orderid': f"S-{order['symbol']}"}]}
+
+
+def _order(symbol, quantity=75, action='SELL'):
+    return {'symbol': symbol, 'exchange': 'NFO', 'action': action, 'quantity': quantity,
+            'price_type': 'MARKET', 'product': 'MIS'}
+
+
+def test_basket_results_are_matched_by_symbol(strategy):
+    client = FakeClient(failing={'NIFTY24000PE'})
+    orders = [_order('NIFTY24000CE'), _order('NIFTY24000PE'), _order('NIFTY24500CE', action='BUY')]
+
+    responses = place_orders_with_freeze_check(client, strategy.user_id, 'spread', orders)
+
+    assert client.calls == [('basket', ['NIFTY24000CE', 'NIFTY24000PE', 'NIFTY24500CE'])]
+    assert responses[0] == {'status': 'success', 'orderid': 'B1'}
+    assert responses[1] == {'status': 'error', 'message': 'rejected', 'orderid': None}
+    assert responses[2] == {'status': 'success', 'orderid': 'B3'}
+
+
+def test_repeated_symbol_takes_results_in_order(strategy):
+    client = FakeClient(basket_response={'status': 'success', 'results': [
+        {'symbol': 'NIFTY24000CE', 'status': 'success', 'orderid': 'FIRST'},
+        {'symbol': 'NIFTY24500CE', 'status': 'success', 'orderid': 'OTHER'},
+        {'symbol': 'NIFTY24000CE', 'status': 'success', 'orderid': 'SECOND'},
+    ]})
+    orders = [_order('NIFTY24000CE'), _order('NIFTY24500CE'), _order('NIFTY24000CE')]
+
+    responses = place_orders_with_freeze_check(client, strategy.user_id, 'spread', orders)
+
+    assert [response['orderid'] for response in responses] == ['FIRST', 'OTHER', 'SECOND']
+
+
+def test_missing_basket_result_is_an_error(strategy):
+    client = FakeClient(basket_response={'status': 'error', 'message': 'broker down'})
+    orders = [_order('NIFTY24000CE'), _order('NIFTY24000PE')]
+
+    responses = place_orders_with_freeze_check(client, strategy.user_id, 'spread', orders)
+
+    assert responses == [{'status': 'error', 'message': 'broker down', 'orderid': None}] * 2
+
+
+def test_split_and_lone_orders_bypass_the_basket(strategy):
+    client = FakeClient()
+    # 1800 is above the default NIFTY freeze quantity, so that order is split
+    orders = [_order('NIFTY24000CE', quantity=1800), _order('NIFTY24000PE')]
+
+    responses = place_orders_with_freeze_check(client, strategy.user_id, 'spread', orders)
+
+    assert client.calls == [('split', ['NIFTY24000CE']), ('single', ['NIFTY24000PE'])]
+    assert responses[0]['orderid'] == 'S-NIFTY24000CE'
+    assert responses[1]['orderid'] == 'P-NIFTY24000PE'
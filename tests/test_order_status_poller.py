@@ -0,0 +1,60 @@
+"""
+Tests for entry fills recorded by the order status poller
+"""
+
+from app import db
+from app.models import StrategyExecution, StrategyLeg, TradingAccount
+from app.utils import order_status_poller as poller_module
+from app.utils.order_status_poller import order_status_poller
+
+
+class FakeClient:
+    def __init__(self, api_key, host):
+        pass
+
+    def orderstatus(self, order_id, strategy):
+        return {'status': 'success', 'data': {'order_status': 'complete', 'average_price': 101.5}}
+
+
+class FakePositionMonitor:
+    def on_order_filled(self, execution):
+        pass
+
+
+def test_second_fill_on_a_leg_is_entered_for_the_exit_sweeps(app, strategy, monkeypatch):
+    monkeypatch.setattr(poller_module, 'ExtendedOpenAlgoAPI', FakeClient)
+    monkeypatch.setattr(poller_module, 'get_position_monitor', FakePositionMonitor)
+    account = TradingAccount.query.filter_by(user_id=strategy.user_id).one()
+    leg = strategy.legs.filter_by(leg_number=1).one()
+
+    open_execution = StrategyExecution(strategy_id=strategy.id, account_id=account.id, leg_id=leg.id,
+                                       symbol='NIFTY24000CE', exchange='NFO', quantity=75,
+                                       status='entered', order_id='ORDER1')
+    second_fill = StrategyExecution(strategy_id=strategy.id, account_id=account.id, leg_id=leg.id,
+                                    symbol='NIFTY24000CE', exchange='NFO', quantity=75,
+                                    status='pending', order_id='ORDER2')
+    db.session.add_all([open_execution, second_fill])
+    db.session.commit()
+
+    order_info = {
+        'account_id': account.id,
+        'account_name': account.account_name,
+        'api_key': 'key',
+        'host_url': account.host_url,
+        'order_id': 'ORDER2',
+        'strategy_name': strategy.name,
+        'check_count': 0
+    }
+    monkeypatch.setitem(order_status_poller.pending_orders, second_fill.id, order_info)
+    monkeypatch.setattr(order_status_poller, 'last_check_time', {})
+
+    order_status_poller._check_order_status(second_fill.id, order_info, app)
+
+    # A real broker position must be visible to the exit sweeps, never parked outside them
+    db.session.expire_all()
+    second_fill = db.session.get(StrategyExecution, second_fill.id)
+    assert second_fill.status == 'entered'
+    assert second_fill.entry_price == 101.5
+    assert second_fill.id not in order_status_poller.pending_orders
+    assert db.session.get(StrategyExecution, open_execution.id).status == 'entered'
+    assert db.session.get(StrategyLeg, leg.id).is_executed is True
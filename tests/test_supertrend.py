@@ -0,0 +1,66 @@
+"""
+Tests for calculate_supertrend_incremental against the full calculation
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.utils.supertrend import (
+    calculate_supertrend, calculate_supertrend_incremental, calculate_spread_supertrend
+)
+
+BARS = 200
+
+
+@pytest.fixture
+def prices():
+    rng = np.random.default_rng(7)
+    close = 200 + rng.standard_normal(BARS).cumsum()
+    spread = np.abs(rng.standard_normal(BARS)) + 0.5
+    return np.arange(BARS), close + spread, close - spread, close
+
+
+def _assert_same(result, expected):
+    np.testing.assert_allclose(result[0], expected[0], rtol=1e-9, equal_nan=True)
+    np.testing.assert_array_equal(result[1], expected[1])
+
+
+def test_growing_window_matches_full_calculation(prices):
+    timestamps, high, low, close = prices
+    for end in range(50, BARS):
+        result = calculate_supertrend_incremental('growing', timestamps[:end], high[:end], low[:end], close[:end])
+        _assert_same(result, calculate_supertrend(high[:end], low[:end], close[:end]))
+
+
+def test_sliding_window_matches_full_calculation(prices):
+    timestamps, high, low, close = prices
+    for end in range(50, BARS):
+        window = slice(end - 50, end)
+        result = calculate_supertrend_incremental('sliding', timestamps[window], high[window],
+                                                  low[window], close[window])
+        _assert_same(result, calculate_supertrend(high[window], low[window], close[window]))
+
+
+def test_revised_last_bar_is_recomputed(prices):
+    timestamps, high, low, close = prices
+    calculate_supertrend_incremental('revised', timestamps[:100], high[:100], low[:100], close[:100])
+
+    close = close[:100].copy()
+    close[-1] += 25
+    result = calculate_supertrend_incremental('revised', timestamps[:100], high[:100], low[:100], close)
+    _assert_same(result, calculate_supertrend(high[:100], low[:100], close))
+
+
+def test_spread_legs_are_aligned_on_shared_bars():
+    index = pd.date_range('2026-01-05 09:15', periods=30, freq='5min')
+    base = np.arange(30, dtype=float)
+    leg = pd.DataFrame({'high': base + 2, 'low': base, 'close': base + 1}, index=index)
+    # The second leg is missing one candle; its later bars must not shift onto earlier ones
+    gapped = (leg * 2).drop(index[3])
+
+    result = calculate_spread_supertrend({'a': leg, 'b': gapped}, period=3)
+
+    assert len(result['close']) == 29
+    assert index[3] not in result['close'].index
+    np.testing.assert_allclose(result['close'].to_numpy(), (leg['close'] * 3).drop(index[3]).to_numpy())